@@ -0,0 +1,104 @@
+"""
+Import-time budget of the entry point, measured with `python -X importtime`.
+
+Each scenario imports what a kind of run loads before doing any work, in a
+fresh interpreter, and checks its cumulative import time against a budget and
+that none of the modules reserved for other stages were loaded. Exits with
+status 1 when a scenario is over budget or loads a forbidden module.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeat 5 --scale 2 --output imports.json
+"""
+import os, sys, json, argparse, subprocess
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# heavy dependencies of the populate stage (browser, workbook parsing, HTTP, validation)
+EXTRACTION_MODULES = ["selenium", "webdriver_manager", "openpyxl", "pyexcel", "requests", "pydantic"]
+
+SCENARIOS = {
+    # `main.py --help` or a run with nothing to do
+    "cli": {
+        "code": "import main",
+        "budget_ms": 250,
+        "forbidden": ["pandas", "numpy", *EXTRACTION_MODULES],
+    },
+    # `main.py --read_and_process`
+    "read_and_process": {
+        "code": "import main; import data_access.sqlite_estados, functions.file_saving, functions.manifest, functions.reporting",
+        "budget_ms": 1500,
+        "forbidden": EXTRACTION_MODULES,
+    },
+    # `main.py --populate`, for reference
+    "populate": {
+        "code": "import main; import data_access.sqlite_estados, functions.extraction, functions.merging, models.model_estado",
+        "budget_ms": 2500,
+        "forbidden": ["selenium", "webdriver_manager"],
+    },
+}
+
+def measure(code: str) -> tuple:
+    """
+    Runs `code` in a fresh interpreter and returns (cumulative import time in ms, loaded top-level modules).
+    """
+    probe = f"{code}\nimport sys; print(','.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=SRC, capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # top-level entries (no indentation) add up to the whole import
+        if not name.startswith("  ") and cumulative.strip().isdigit():
+            total_us += int(cumulative)
+    modules = set(process.stdout.strip().splitlines()[-1].split(","))
+    return total_us / 1000, modules
+
+def check(name: str, repeat: int = 3, scale: float = 1.0, baseline_ms: float = None) -> dict:
+    """
+    Measures one scenario and returns its result: import time (baseline excluded), budget,
+    forbidden modules that were loaded, and whether it passed.
+    """
+    if baseline_ms is None:
+        baseline_ms = min(measure("pass")[0] for _ in range(repeat))
+    scenario = SCENARIOS[name]
+    runs = [measure(scenario["code"]) for _ in range(repeat)]
+    elapsed_ms = min(ms for ms, _ in runs) - baseline_ms
+    loaded = sorted(set(scenario["forbidden"]) & runs[0][1])
+    budget_ms = scenario["budget_ms"] * scale
+    return {
+        "scenario": name,
+        "import_ms": round(elapsed_ms, 1),
+        "budget_ms": budget_ms,
+        "forbidden_loaded": loaded,
+        "ok": elapsed_ms <= budget_ms and not loaded,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the fastest one is kept")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies every budget (slow machines)")
+    parser.add_argument("--output", help="JSON file where the results are written")
+    args = parser.parse_args()
+
+    # interpreter startup (site, .pth files) is measured once and left out of every scenario
+    baseline_ms = min(measure("pass")[0] for _ in range(args.repeat))
+
+    results = [check(name, args.repeat, args.scale, baseline_ms) for name in args.scenarios]
+
+    for result in results:
+        status = "ok" if result["ok"] else "FAIL"
+        forbidden = f" | loads {', '.join(result['forbidden_loaded'])}" if result["forbidden_loaded"] else ""
+        print(f"{result['scenario']:<18} {result['import_ms']:>8.1f}ms / {result['budget_ms']:.0f}ms  {status}{forbidden}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if not all(result["ok"] for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
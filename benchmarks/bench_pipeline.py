@@ -0,0 +1,160 @@
+"""
+Times every pipeline stage on synthetic data: web table parsing, the input
+workbook (parsed and from the converted-input cache), the merge, the SQLite
+writes and reads, each report transform, generate_report and each writer.
+
+    python benchmarks/bench_pipeline.py --sizes 1000 100000 --output results.json
+    python benchmarks/bench_pipeline.py --sizes 100000 --compare results.json --max-slowdown 1.25
+
+Results are stored as JSON; --compare prints the ratio against a previous
+run and exits with status 1 when a stage got slower than --max-slowdown.
+"""
+import os, sys, json, argparse, platform, tempfile, logging
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pandas as pd
+
+import app
+from data_access.sqlite_estados import SQLiteEstados
+from functions.extraction import get_file_dataframe
+from functions.file_saving import (
+    generate_report, most_populated_state_transform, regions_and_capitals_transform, top_3_populated_regions_transform,
+    regions_and_capitals_from_aggregates_transform, top_3_populated_regions_from_aggregates_transform,
+)
+from functions.merging import HashJoin, title_case
+from functions.metrics import MetricsRecorder
+from functions.writers import WRITERS, write_dataframe
+from plugins.http import HttpSession, parse_table
+from plugins.sqlite.connection import close_pools
+from generators import XLSX_MAX_ROWS, make_estados, write_capitals_xlsx, write_estados_html
+
+TRANSFORMS = {
+    "most_populated_state": most_populated_state_transform,
+    "regions_and_capitals": regions_and_capitals_transform,
+    "top_3_populated_regions": top_3_populated_regions_transform,
+}
+AGGREGATE_TRANSFORMS = {
+    "regions_and_capitals_from_aggregates": regions_and_capitals_from_aggregates_transform,
+    "top_3_populated_regions_from_aggregates": top_3_populated_regions_from_aggregates_transform,
+}
+# row limits of the legacy spreadsheet formats
+WRITER_MAX_ROWS = {".xls": 65_535, ".xlsx": XLSX_MAX_ROWS}
+
+def run_size(rows: int, tmp: str, writers: list) -> list:
+    metrics = MetricsRecorder()
+    stage = metrics.stage
+    df = make_estados(rows)
+
+    html_path = os.path.join(tmp, "estados.html")
+    write_estados_html(df, html_path)
+    with stage("web_parse", rows=rows):
+        with HttpSession() as session:
+            html = session.get_text("file://" + html_path)
+        columns, values = parse_table(html, attrs={"bgcolor": "#ffffff"})
+        df_web = title_case(pd.DataFrame(values, columns=columns)[["Estado", "Capital", "Região"]].set_axis(["estado", "capital", "regiao"], axis=1))
+
+    df_file = df[["capital", "populacao"]]
+    if rows <= XLSX_MAX_ROWS:
+        xlsx_path = os.path.join(tmp, "capitais.xlsx")
+        write_capitals_xlsx(df, xlsx_path)
+        with stage("file_read", rows=rows):
+            df_file = get_file_dataframe(xlsx_path, refresh_cache=True)
+        with stage("file_read_cached", rows=rows):
+            df_file = get_file_dataframe(xlsx_path)
+
+    with stage("merge", rows=rows) as handle:
+        df_inner = HashJoin(df_web, on="capital").probe(df_file)
+        handle.rows = len(df_inner)
+
+    db_path = os.path.join(tmp, "bench.db")
+    with SQLiteEstados(db_path) as table:
+        with stage("insert_df", rows=rows):
+            table.insert_df(df)
+        with stage("upsert_df", rows=rows):
+            table.upsert_df(df.assign(populacao=df["populacao"] + 1))
+        with stage("read_all", rows=rows):
+            df_read = table.read_all()
+        with stage("read_region_aggregates"):
+            aggregates = table.read_region_aggregates()
+    close_pools()
+
+    for name, transform in TRANSFORMS.items():
+        with stage(f"transform:{name}", rows=rows):
+            transform(df_read)
+    for name, transform in AGGREGATE_TRANSFORMS.items():
+        with stage(f"transform:{name}", rows=len(aggregates)):
+            transform(aggregates)
+
+    for name, transform in TRANSFORMS.items():
+        with stage(f"generate_report:{name}", rows=rows):
+            generate_report(df_read, transform, os.path.join(tmp, f"{name}.xls"))
+
+    for extension in writers:
+        if rows > WRITER_MAX_ROWS.get(extension, rows):
+            continue
+        try:
+            with stage(f"write:{extension}", rows=rows):
+                write_dataframe(df_read, os.path.join(tmp, f"estados{extension}"))
+        except Exception as e:
+            # optional backends (pyarrow, pyexcel plugins) may not be installed
+            metrics.stages.pop(f"write:{extension}", None)
+            print(f"write:{extension} skipped: {type(e).__name__}: {e}", file=sys.stderr)
+
+    results = []
+    for row in metrics.summary():
+        row["size"] = rows
+        row["rows_per_s"] = row["rows"] / row["wall_s"] if row["rows"] and row["wall_s"] else None
+        results.append(row)
+    return results
+
+def compare(results: list, baseline_path: str, max_slowdown: float) -> bool:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(row["size"], row["stage"]): row for row in json.load(f)["results"]}
+
+    ok = True
+    for row in results:
+        before = baseline.get((row["size"], row["stage"]))
+        if before is None or not before["wall_s"]:
+            continue
+        ratio = row["wall_s"] / before["wall_s"]
+        regressed = ratio > max_slowdown
+        ok = ok and not regressed
+        print(f"{row['size']:>10} {row['stage']:<50} {before['wall_s']:>9.4f}s -> {row['wall_s']:>9.4f}s  x{ratio:.2f}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="dataset sizes, in rows (10^3 to 10^7)")
+    parser.add_argument("--writers", nargs="+", default=sorted(WRITERS), help="report writer extensions to time")
+    parser.add_argument("--output", help="JSON file where the results are written")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.25, help="ratio above which --compare reports a regression")
+    args = parser.parse_args()
+
+    app.config.input_cache = True
+    app.logger.setLevel(logging.WARNING)
+
+    results = []
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            results.extend(run_size(rows, tmp, args.writers))
+
+    for row in results:
+        rate = "" if row["rows_per_s"] is None else f"{row['rows_per_s']:>14,.0f} rows/s"
+        print(f"{row['size']:>10} {row['stage']:<50} {row['wall_s']:>9.4f}s {rate}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+    if args.compare and not compare(results, args.compare, args.max_slowdown):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Insert and read throughput of SQLiteEstados with the default SQLite settings
+versus the tuned connection factory (WAL, synchronous=NORMAL, mmap, larger cache).
+
+    python benchmarks/bench_sqlite.py --rows 200000 --batch-size 5000
+"""
+import os, sys, json, argparse, tempfile, threading
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pandas as pd
+
+from data_access.sqlite_estados import SQLiteEstados
+from plugins.sqlite.connection import close_pools
+from generators import make_estados
+
+PROFILES = {
+    # sqlite3.connect defaults, as used before the connection factory existed
+    "default": dict(journal_mode="DELETE", synchronous="FULL", mmap_size=0, cache_size=-2000),
+    "tuned": dict(journal_mode="WAL", synchronous="NORMAL", mmap_size=256 * 1024 * 1024, cache_size=-64_000),
+}
+
+def run_profile(name: str, df: pd.DataFrame, batch_size: int, readers: int) -> dict:
+    settings = PROFILES[name]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        result = {"profile": name, "rows": len(df)}
+
+        with SQLiteEstados(db_path, batch_size=batch_size, **settings) as table:
+            start = perf_counter()
+            table.upsert_df(df)
+            result["upsert_rows_per_s"] = len(df) / (perf_counter() - start)
+
+            changed = df.assign(populacao=df["populacao"] + 1)
+            start = perf_counter()
+            table.upsert_df(changed)
+            result["update_rows_per_s"] = len(df) / (perf_counter() - start)
+
+            start = perf_counter()
+            table.read_all()
+            result["read_all_rows_per_s"] = len(df) / (perf_counter() - start)
+
+            start = perf_counter()
+            for _ in table.read_chunks(chunksize=batch_size):
+                pass
+            result["read_chunks_rows_per_s"] = len(df) / (perf_counter() - start)
+
+        # concurrent readers while a writer upserts
+        timings = []
+        def reader():
+            with SQLiteEstados(db_path, **settings) as table:
+                start = perf_counter()
+                table.read_all()
+                timings.append(perf_counter() - start)
+
+        start = perf_counter()
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        with SQLiteEstados(db_path, batch_size=batch_size, **settings) as table:
+            table.upsert_df(df)
+        for thread in threads:
+            thread.join()
+        result["mixed_wall_s"] = perf_counter() - start
+        result["mixed_reader_avg_s"] = sum(timings) / max(len(timings), 1)
+
+        close_pools()
+        return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--readers", type=int, default=3)
+    parser.add_argument("--output", help="JSON file where the results are written")
+    args = parser.parse_args()
+
+    df = make_estados(args.rows)
+    results = [run_profile(name, df, args.batch_size, args.readers) for name in PROFILES]
+
+    for result in results:
+        print(" | ".join(f"{k}: {v:,.0f}" if isinstance(v, float) and v > 100 else f"{k}: {v:.3f}" if isinstance(v, float) else f"{k}: {v}" for k, v in result.items()))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
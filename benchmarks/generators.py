@@ -0,0 +1,55 @@
+"""
+Synthetic inputs shaped like the real ones: the estados table, the
+"Capital/populacao" workbook and the HTML page with the states table.
+"""
+from html import escape
+
+import numpy as np
+import pandas as pd
+
+REGIOES = np.array(["Norte", "Nordeste", "Centro-Oeste", "Sudeste", "Sul"])
+# rows an xlsx sheet can hold below its header
+XLSX_MAX_ROWS = 1_048_575
+
+def make_estados(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows).astype(str)
+    return pd.DataFrame({
+        "estado": np.char.add("Estado ", ids),
+        "capital": np.char.add("Capital ", ids),
+        "regiao": REGIOES[rng.integers(0, len(REGIOES), rows)],
+        "populacao": rng.integers(1_000, 12_000_000, rows),
+    })
+
+def write_capitals_xlsx(df: pd.DataFrame, path: str):
+    """
+    Writes the capital and population of each row as "Capital: populacao", like input/PopulaçãoxCapital.xlsx.
+    """
+    if len(df) > XLSX_MAX_ROWS:
+        raise ValueError(f"An xlsx sheet holds at most {XLSX_MAX_ROWS} rows, got {len(df)}")
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["Capital/populacao", None, None])
+    for capital, populacao in zip(df["capital"], df["populacao"]):
+        sheet.append([f"{capital}: {populacao}", None, None])
+    workbook.save(path)
+
+def write_estados_html(df: pd.DataFrame, path: str):
+    """
+    Writes a page with the states table (bgcolor="#ffffff") after a layout table, like the source blog post.
+    """
+    rows = "\n".join(
+        f"<tr><td>{escape(estado)}</td><td>{escape(estado[:2].upper())}</td><td>{escape(capital)}</td><td>{escape(regiao)}</td></tr>"
+        for estado, capital, regiao in zip(df["estado"], df["capital"], df["regiao"])
+    )
+    html = (
+        "<html><head><title>Lista de estados brasileiros</title></head><body>\n"
+        "<table class=\"layout\"><tr><td>menu</td><td>posts</td></tr></table>\n"
+        "<table bgcolor=\"#ffffff\" border=\"1\">\n"
+        "<tr><th>Estado</th><th>Sigla</th><th>Capital</th><th>Região</th></tr>\n"
+        f"{rows}\n</table>\n</body></html>\n"
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
@@ -1,14 +1,40 @@
 import os
 import sys
+import copy
+import atexit
 import logging
 import logging.handlers
-from io import StringIO
-from ansimarkup import parse
-from typing import Tuple
+from collections import deque
+from datetime import datetime
+from queue import SimpleQueue
+from typing import Dict, Tuple
+
+try:
+    import orjson
+
+    def _dumps(obj: dict) -> str:
+        return orjson.dumps(obj, default=str).decode('utf-8')
+except ImportError:
+    import json
+
+    def _dumps(obj: dict) -> str:
+        return json.dumps(obj, ensure_ascii=False, default=str, separators=(',', ':'))
+
+# atributos extras (logger.info(..., extra={...})) copiados para o log estruturado
+STRUCTURED_FIELDS = ('stage', 'duration_s', 'cpu_s', 'rows', 'status', 'attempts', 'output_path')
+
+def _parse_markup(s: str) -> str:
+    """ Interpreta marcações do ansimarkup (<red>, <b>...) presentes na mensagem """
+    from ansimarkup import parse
+    try:
+        return parse(s)
+    except Exception:
+        # texto com '<' que não é marcação (ex.: trechos de HTML) é mantido como está
+        return s
 
 class ColoredFormatter(logging.Formatter):
     """ Formatter para saída colorida no standard output """
-    
+
     grey = "\x1b[38;20m"
     yellow = "\x1b[33;20m"
     red = "\x1b[31;20m"
@@ -25,32 +51,126 @@ class ColoredFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         """ Formata mensagem """
-        mapping = self.MAPPING.get(record.levelname)
-        prefix = mapping['prefix']
-        suffix = mapping['suffix']
+        mapping = self.MAPPING.get(record.levelname, self.MAPPING['INFO'])
         s = super().format(record)
-        return parse(f'{prefix}{s}{suffix}')
+        # o ansimarkup só é chamado quando a mensagem pode conter marcação
+        if '<' in s:
+            s = _parse_markup(s)
+        return f"{mapping['prefix']}{s}{mapping['suffix']}"
+
+class JsonFormatter(logging.Formatter):
+    """ Formatter que gera uma linha JSON por registro, para ingestão por coletores de log """
+
+    def __init__(self, fields: Dict[str, object] = None):
+        """
+        :param fields: campos fixos incluídos em todo registro (ex.: {'bot_id': 'robot01'})
+        """
+        super().__init__()
+        self.fields = dict(fields or {})
+
+    def format(self, record: logging.LogRecord) -> str:
+        """ Formata mensagem """
+        event = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'message': record.getMessage().strip(),
+            **self.fields,
+        }
+        for name in STRUCTURED_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                event[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            event['exc_info'] = record.exc_text
+        return _dumps(event)
+
+class EventFilter(logging.Filter):
+    """ Descarta registros marcados com extra={'event': True}, que só interessam ao log estruturado """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not getattr(record, 'event', False)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """ QueueHandler que preserva o traceback em exc_text, em vez de embuti-lo na mensagem """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+class RingBufferIO:
+    """ Stream em memória que guarda apenas as últimas linhas de log """
+
+    def __init__(self, max_lines: int = 10_000):
+        """
+        :param max_lines: quantidade máxima de registros mantidos; os mais antigos são descartados
+        """
+        self._lines = deque(maxlen=max_lines)
+
+    def write(self, s: str) -> int:
+        self._lines.append(s)
+        return len(s)
+
+    def flush(self):
+        pass
+
+    def getvalue(self) -> str:
+        """ Retorna o conteúdo do buffer, como StringIO.getvalue """
+        return ''.join(self._lines)
+
+    def __len__(self) -> int:
+        return len(self._lines)
 
 class AppLogger:
     """ Classe que representa o logger da aplicação """
     _logger = None
+    _listener = None
+    _handlers = []
 
     @classmethod
-    def setup(cls, 
-              log_filename: str = None, 
-              file_mode: str = 'w', 
-              file_fmt: str = u'%(asctime)s | %(levelname)s | %(message)s', 
+    def setup(cls,
+              log_filename: str = None,
+              file_mode: str = 'w',
+              file_fmt: str = u'%(asctime)s | %(levelname)s | %(message)s',
               file_datefmt: str = '%H:%M:%S',
               file_level: str = 'INFO',
-              stream_fmt: str = u'%(message)s', 
+              stream_fmt: str = u'%(message)s',
               stream_datefmt: str = None,
               stream_level: str = 'DEBUG',
-              colored: bool = False) -> Tuple[logging.Logger, StringIO]:
+              colored: bool = False,
+              buffer_lines: int = 10_000,
+              asynchronous: bool = False,
+              rotation: str = None,
+              max_bytes: int = 10 * 1024 * 1024,
+              when: str = 'midnight',
+              backup_count: int = 5,
+              json_log: bool = False,
+              json_fields: Dict[str, object] = None,
+              json_buffer: int = 100) -> Tuple[logging.Logger, RingBufferIO]:
         """
         Retorna instância do logger
 
         :param log_filename: nome do arquivo de log
+        :param buffer_lines: quantidade de registros mantidos em memória (logger_output)
+        :param asynchronous: quando verdadeiro, os registros são enfileirados e escritos por uma thread
+                             (QueueHandler/QueueListener), sem bloquear quem loga
+        :param rotation: rotação do arquivo de log: 'size' (a cada max_bytes) ou 'time' (conforme when)
+        :param max_bytes: tamanho máximo do arquivo de log com rotation='size'
+        :param when: intervalo da rotação com rotation='time' (ver logging.handlers.TimedRotatingFileHandler)
+        :param backup_count: quantidade de arquivos rotacionados mantidos
+        :param json_log: grava também um log estruturado, uma linha JSON por registro, em <log_filename>.jsonl
+        :param json_fields: campos fixos de cada linha JSON (ex.: {'bot_id': ...})
+        :param json_buffer: quantidade de registros acumulados antes de cada escrita do log JSON
+                            (erros são escritos imediatamente)
         """
+        cls.shutdown()
+
         logging.basicConfig()
         logger_name = cls.__module__ + '.' + cls.__name__
         cls._logger = logging.getLogger(logger_name)
@@ -59,20 +179,21 @@ class AppLogger:
         cls._logger.root.handlers.clear()
         cls._logger.handlers.clear()
         cls._logger.propagate = False
+        handlers = []
 
         # configurando o logger para saída em stdout
         stream_handler = logging.StreamHandler(sys.stdout)
         formatter_class = ColoredFormatter if colored else logging.Formatter
         stream_handler.setFormatter(formatter_class(fmt=stream_fmt, datefmt=stream_datefmt))
         stream_handler.setLevel(stream_level.upper())
-        cls._logger.addHandler(stream_handler)
+        handlers.append(stream_handler)
 
-        # configurando o logger para saída em string
-        logger_output = StringIO()
+        # configurando o logger para saída em memória, limitada às últimas buffer_lines linhas
+        logger_output = RingBufferIO(buffer_lines)
         string_handler = logging.StreamHandler(logger_output)
         string_handler.setFormatter(logging.Formatter(fmt=stream_fmt, datefmt=stream_datefmt))
         string_handler.setLevel(stream_level.upper())
-        cls._logger.addHandler(string_handler)
+        handlers.append(string_handler)
 
         # configurando o logger para saída em arquivo
         if log_filename is not None:
@@ -80,10 +201,62 @@ class AppLogger:
             if dirname != '' and not os.path.exists(dirname):
                 os.makedirs(dirname, exist_ok=True)
 
-            file_handler = logging.FileHandler(log_filename, mode=file_mode, encoding='utf-8')
+            if rotation is None:
+                file_handler = logging.FileHandler(log_filename, mode=file_mode, encoding='utf-8')
+            elif rotation == 'size':
+                file_handler = logging.handlers.RotatingFileHandler(
+                    log_filename, mode=file_mode, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+                )
+            elif rotation == 'time':
+                file_handler = logging.handlers.TimedRotatingFileHandler(
+                    log_filename, when=when, backupCount=backup_count, encoding='utf-8'
+                )
+            else:
+                raise ValueError(f"Rotação desconhecida: {rotation!r}. Use 'size' ou 'time'.")
             file_handler.setFormatter(logging.Formatter(fmt=file_fmt, datefmt=file_datefmt))
             file_handler.setLevel(file_level.upper())
-            cls._logger.addHandler(file_handler)
+            handlers.append(file_handler)
+
+        # os eventos estruturados (extra={'event': True}) não aparecem nas saídas de texto
+        for handler in handlers:
+            handler.addFilter(EventFilter())
+
+        # configurando o log estruturado, com escrita em lotes
+        if json_log and log_filename is not None:
+            json_filename = os.path.splitext(log_filename)[0] + '.jsonl'
+            json_handler = logging.FileHandler(json_filename, mode=file_mode, encoding='utf-8')
+            json_handler.setFormatter(JsonFormatter(json_fields))
+            buffered_handler = logging.handlers.MemoryHandler(json_buffer, flushLevel=logging.ERROR, target=json_handler)
+            buffered_handler.setLevel(file_level.upper())
+            handlers.append(buffered_handler)
+
+        if asynchronous:
+            # os handlers passam a rodar na thread do listener; quem loga apenas enfileira o registro
+            queue = SimpleQueue()
+            cls._logger.addHandler(_QueueHandler(queue))
+            cls._listener = logging.handlers.QueueListener(queue, *handlers, respect_handler_level=True)
+            cls._listener.start()
+        else:
+            for handler in handlers:
+                cls._logger.addHandler(handler)
+        cls._handlers = handlers
 
         return cls._logger, logger_output
 
+    @classmethod
+    def shutdown(cls):
+        """
+        Para o listener do modo assíncrono, escrevendo os registros ainda na fila, e fecha os handlers
+        (o que também descarrega o buffer do log JSON)
+        """
+        if cls._listener is not None:
+            listener, cls._listener = cls._listener, None
+            listener.stop()
+        handlers, cls._handlers = cls._handlers, []
+        for handler in handlers:
+            if isinstance(handler, logging.handlers.MemoryHandler) and handler.target is not None:
+                handler.flush()
+                handler.target.close()
+            handler.close()
+
+atexit.register(AppLogger.shutdown)
@@ -1,10 +1,65 @@
 from plugins.sqlite.table import SQLiteTable
-from models.model_estado import Estado
 
 class SQLiteEstados(SQLiteTable):
+    migrations = [
+        # 1: chave única por estado (mantém o registro mais recente de bases antigas com duplicatas)
+        [
+            "DELETE FROM {table_name} WHERE rowid NOT IN (SELECT MAX(rowid) FROM {table_name} GROUP BY estado);",
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_{table_name}_estado ON {table_name} (estado);",
+        ],
+        # 2: contador de alterações, usado para pular relatórios cujos dados não mudaram
+        SQLiteTable.CHANGE_TRACKING_MIGRATION,
+        # 3: agregados por região (quantidade de estados e população), mantidos por triggers
+        [
+            """
+            CREATE TABLE IF NOT EXISTS region_aggregates (
+                regiao TEXT PRIMARY KEY,
+                n_estados INTEGER NOT NULL,
+                populacao INTEGER NOT NULL
+            );
+            """,
+            """
+            INSERT OR REPLACE INTO region_aggregates (regiao, n_estados, populacao)
+            SELECT regiao, COUNT(*), SUM(populacao) FROM {table_name} GROUP BY regiao;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_aggregates_insert
+            AFTER INSERT ON {table_name}
+            BEGIN
+                INSERT INTO region_aggregates (regiao, n_estados, populacao) VALUES (NEW.regiao, 1, NEW.populacao)
+                ON CONFLICT (regiao) DO UPDATE SET
+                    n_estados = n_estados + 1,
+                    populacao = populacao + excluded.populacao;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_aggregates_delete
+            AFTER DELETE ON {table_name}
+            BEGIN
+                UPDATE region_aggregates SET n_estados = n_estados - 1, populacao = populacao - OLD.populacao
+                WHERE regiao = OLD.regiao;
+                DELETE FROM region_aggregates WHERE regiao = OLD.regiao AND n_estados <= 0;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_aggregates_update
+            AFTER UPDATE OF regiao, populacao ON {table_name}
+            BEGIN
+                UPDATE region_aggregates SET n_estados = n_estados - 1, populacao = populacao - OLD.populacao
+                WHERE regiao = OLD.regiao;
+                DELETE FROM region_aggregates WHERE regiao = OLD.regiao AND n_estados <= 0;
+                INSERT INTO region_aggregates (regiao, n_estados, populacao) VALUES (NEW.regiao, 1, NEW.populacao)
+                ON CONFLICT (regiao) DO UPDATE SET
+                    n_estados = n_estados + 1,
+                    populacao = populacao + excluded.populacao;
+            END;
+            """,
+        ],
+    ]
     
-    def __init__(self, db_location):
-        super().__init__(db_location)
+    def __init__(self, db_location, batch_size=10_000, **connection_settings):
+        self.batch_size = batch_size
+        super().__init__(db_location, **connection_settings)
         self.table_name = "estados"
 
     def create_table(self):
@@ -18,35 +73,49 @@ class SQLiteEstados(SQLiteTable):
         """
         self._conn.execute(create_table_query)
         
-    def insert_df(self, df):
-        objects = [Estado(**row.to_dict()) for _, row in df.iterrows()]
+    def insert_df(self, df, strict=False, validate=True):
+        if validate:
+            # pydantic só é carregado quando há escrita
+            from models.model_estado import validate_estados
+            df = validate_estados(df, strict=strict)
         
         query = f"""
         INSERT INTO {self.table_name} (estado, capital, regiao, populacao)
         VALUES (?, ?, ?, ?);
         """
-        values = [(obj.estado, obj.capital, obj.regiao, obj.populacao) for obj in objects]
-        self.executemany(query=query, values=values)
+        values = df[["estado", "capital", "regiao", "populacao"]].itertuples(index=False, name=None)
+        self.executemany(query=query, values=values, batch_size=self.batch_size)
         
-    def upsert_df(self, df):
-        objects = [Estado(**row.to_dict()) for _, row in df.iterrows()]
+    def upsert_df(self, df, strict=False, validate=True):
+        if validate:
+            # pydantic só é carregado quando há escrita
+            from models.model_estado import validate_estados
+            df = validate_estados(df, strict=strict)
         
         query = f"""
         INSERT INTO {self.table_name} (estado, capital, regiao, populacao)
-        VALUES (?, ?, ?, ?);
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (estado) DO UPDATE SET
+            capital = excluded.capital,
+            regiao = excluded.regiao,
+            populacao = excluded.populacao
+        WHERE (capital, regiao, populacao) IS NOT (excluded.capital, excluded.regiao, excluded.populacao);
         """
-        
-        existing_query = f"SELECT estado FROM {self.table_name}"
-        existing_records = set(estado[0] for estado in self.execute(existing_query).fetchall())
-        values = [
-            (obj.estado, obj.capital, obj.regiao, obj.populacao)
-            for obj in objects
-            if obj.estado not in existing_records
-        ]
-        self.executemany(query=query, values=values)
+        values = df[["estado", "capital", "regiao", "populacao"]].itertuples(index=False, name=None)
+        self.executemany(query=query, values=values, batch_size=self.batch_size)
         
     def read_all(self):
         query = f"""
         SELECT * FROM {self.table_name}
         """
+        return self.read(query)
+        
+    def read_region_aggregates(self):
+        """
+        Lê a quantidade de estados e a população total de cada região, mantidas pelos triggers
+        da tabela, sem varrer os estados
+        """
+        query = """
+        SELECT regiao, n_estados, populacao FROM region_aggregates ORDER BY regiao
+        """
         return self.read(query)
\ No newline at end of file
@@ -1,52 +1,435 @@
-from plugins.selenium.selenium import Selenium
-from selenium.webdriver.common.by import By
+from plugins.http import HttpCache, HttpSession, find_next_link, parse_table
+from functions.input_cache import cached_chunks
+from functions.merging import title_case
+from functions.metrics import get_metrics
+from functions.pagination import PAGINATION_MODES, RowCollector, collect_pages, follow_next_links, prefetch, template_urls
+from functions.scheduler import BoundedScheduler
+from dotmap import DotMap
+from typing import Dict, Iterator, List, Tuple
+from urllib.parse import urlparse
+from time import monotonic
 
+import numpy as np
 import pandas as pd
-import traceback, app, os, string
+import traceback, app, os, string, atexit, threading, hashlib, requests
+
+TABLE_ATTRS = {"bgcolor": "#ffffff"}
+COLUMNS = {"Estado": "estado", "Capital": "capital", "Região": "regiao"}
+
+FILE_PATH = os.path.join("..", "input", "PopulaçãoxCapital.xlsx")
+FILE_COLUMN = "Capital/populacao"
+# bump when the file parsing changes, to invalidate converted-input caches
+FILE_PARSER_VERSION = "1"
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+_selenium_pool = None
+_selenium_pool_lock = threading.Lock()
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+def get_selenium_pool() -> "SeleniumPool":
+    """
+    Returns the process-wide pool of warm Selenium sessions, created on first use
+    with app.config.selenium_pool_size sessions (default 1) launched with the
+    app.config.selenium_profile profile (default "scrape"), and closed at exit.
+    Performance logging is turned on when a source reads its table from a network
+    response (`response_url`).
+    """
+    # selenium is only imported when a source actually needs the browser
+    from plugins.selenium import SeleniumPool
+
+    global _selenium_pool
+    with _selenium_pool_lock:
+        if _selenium_pool is None:
+            _selenium_pool = SeleniumPool(
+                size=app.config.get("selenium_pool_size", 1),
+                profile=app.config.get("selenium_profile", "scrape"),
+                performance_log=any(source.response_url for source in get_sources()) or None,
+            )
+            atexit.register(_selenium_pool.close)
+        return _selenium_pool
+
+def get_http_cache() -> HttpCache:
+    """
+    Returns the on-disk HTTP cache configured in app.config.http_cache, or None when it is disabled.
+    """
+    global _http_cache
+    config = app.config.get("http_cache")
+    if not config or not config.get("enabled", True):
+        return None
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(
+                directory=config.get("directory", os.path.join(".", "__cache__", "http")),
+                ttl=config.get("ttl", 3600),
+                max_bytes=config.get("max_bytes", 100 * 1024 * 1024),
+            )
+        return _http_cache
+
+def _xpath(attrs: Dict[str, str]) -> str:
+    predicates = " and ".join(f"@{k}='{v}'" for k, v in attrs.items())
+    return f"//table[{predicates}]" if predicates else "//table"
+
+def _fetch_table_http(source: DotMap, session: HttpSession, html: str = None) -> Tuple[List[str], List[List[str]]]:
+    if html is None:
+        app.logger.info(f"\t[{source.name}] Downloading page...")
+        html = session.get_text(source.url, timeout=source.timeout)
+
+    app.logger.info(f"\t[{source.name}] Getting table element...")
+    return parse_table(html, attrs=source.table_attrs, index=source.table_index)
+
+def _table_from_json(payload, path: str = None) -> Tuple[List[str], List[List[str]]]:
+    """
+    Turns a JSON payload into (columns, rows). `path` is a dotted path to the records inside the
+    payload; records are either objects (keys become columns) or lists whose first item is the header.
+    """
+    for key in path.split(".") if path else []:
+        payload = payload[int(key)] if isinstance(payload, list) else payload[key]
+    if not isinstance(payload, list) or not payload:
+        raise LookupError(f"No records found in the JSON response (path: {path!r}).")
+    if isinstance(payload[0], dict):
+        columns = list(dict.fromkeys(key for record in payload for key in record))
+        return columns, [[record.get(column) for column in columns] for record in payload]
+    return [str(column) for column in payload[0]], [list(row) for row in payload[1:]]
+
+def _fetch_table_network(source: DotMap, webdriver) -> Tuple[List[str], List[List[str]]]:
+    webdriver.clear_network_log()
+    webdriver.go_to_url(source.url)
+
+    app.logger.info(f"\t[{source.name}] Capturing network response...")
+    response = webdriver.capture_response(source.response_url)
+    if "json" in (response.mime_type or ""):
+        return _table_from_json(response.json(), source.response_path)
+    return parse_table(response.text, attrs=source.table_attrs, index=source.table_index)
+
+def _fetch_table_selenium(source: DotMap, session: HttpSession = None) -> Tuple[List[str], List[List[str]]]:
+    from selenium.webdriver.common.by import By
+
+    with get_selenium_pool().session() as webdriver:
+        if source.response_url:
+            # the payload behind the page is read straight from the network log, skipping the DOM
+            columns, values = _fetch_table_network(source, webdriver)
+        else:
+            webdriver.go_to_url(source.url)
 
-def get_web_dataframe() -> pd.DataFrame:
-    try:
-        with Selenium() as webdriver:
-            webdriver.go_to_url(app.config.source_url)
-            
             app.logger.warning("\tBeware of the shark!!")
-            
-            driver = webdriver.get_driver()
-            
+
             # Getting table element
-            app.logger.info("\tGetting table element...")
-            table   = driver.find_element(By.XPATH, "//table[@bgcolor='#ffffff']")
-            columns = [header.text for header in table.find_elements(By.XPATH, "//th/span")]
-            rows    = [row.find_elements(By.XPATH, "./td/span") for row in table.find_elements(By.XPATH, "//tbody/tr")]
-            values  = [[cell.text for cell in row] for row in rows if row]
-            
+            app.logger.info(f"\t[{source.name}] Getting table element...")
+            columns, values = webdriver.extract_table((By.XPATH, f"({_xpath(source.table_attrs)})[{source.table_index + 1}]"))
+
+        _record_waits(webdriver)
+    return columns, values
+
+def _record_waits(webdriver) -> None:
+    for name, stats in webdriver.wait_stats.summary(reset=True).items():
+        get_metrics().record(f"wait:{name}", stats["total_s"], calls=stats["waits"])
+
+def _download_page_http(source: DotMap, session: HttpSession, url: str) -> str:
+    try:
+        return session.get_text(url, timeout=source.timeout)
+    except FileNotFoundError:
+        return None
+    except requests.HTTPError as e:
+        # past the last page of a page-number template
+        if e.response is not None and e.response.status_code in (404, 410):
+            return None
+        raise
+
+def _download_page_selenium(source: DotMap, url: str) -> str:
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+
+    with get_selenium_pool().session() as webdriver:
+        webdriver.go_to_url(url)
+        try:
+            webdriver.located((By.XPATH, f"({_xpath(source.table_attrs)})[{source.table_index + 1}]"), short_wait=True)
+        except TimeoutException:
+            # no table: parsing the page tells whether the listing ended
+            pass
+        html = webdriver.get_driver().page_source
+        _record_waits(webdriver)
+    return html
+
+def _scroll_pages(source: DotMap, max_pages: int, idle_ms: int) -> RowCollector:
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+
+    collector = RowCollector()
+    selector = (By.XPATH, f"({_xpath(source.table_attrs)})[{source.table_index + 1}]")
+    with get_selenium_pool().session() as webdriver:
+        webdriver.go_to_url(source.url)
+        offset = 0
+        idle = True
+        for _ in range(max_pages):
+            # only the rows loaded since the last scroll are read from the browser
+            columns, rows = webdriver.extract_table(selector, offset=offset)
+            if not rows:
+                break
+            offset += len(rows)
+            if not collector.add(columns, rows) or not idle:
+                break
+            webdriver.scroll_bottom()
+            try:
+                webdriver.wait_page_ready(idle_ms)
+            except TimeoutException:
+                # pages that never go network-idle (beacons, long-polling): the rows loaded by this
+                # last scroll are still read, then the listing ends
+                app.logger.warning(f"\t[{source.name}] Page never went idle after scrolling, keeping the rows loaded so far")
+                idle = False
+        _record_waits(webdriver)
+    return collector
+
+def _prefetch_depth(source: DotMap) -> int:
+    # page downloads run outside the scheduler, so they are held to the same per-host limit
+    depth = source.pagination.get("prefetch", app.config.get("pagination_prefetch", 4))
+    return max(1, min(depth, app.config.get("max_per_host", 2)))
+
+def fetch_paginated(source: DotMap, session: HttpSession) -> Tuple[List[str], List[List[str]]]:
+    """
+    Fetches a table spread over several pages, as described by source.pagination:
+
+    - mode "template": page URLs from `url_template` (with a `{page}` field, from `start` by `step`);
+      up to `prefetch` pages (default app.config.pagination_prefetch, 4, capped at
+      app.config.max_per_host) are downloaded ahead
+      while the current one is parsed.
+    - mode "next": follows the rel="next" link, or the link whose text contains `next_text`;
+      the next page is downloaded while the current one is parsed.
+    - mode "scroll": infinite scroll in a browser session, reading the rows loaded after each
+      scroll once the page is idle for `idle_ms` (always uses selenium).
+
+    Pages are downloaded by the source engine (http, or sessions of the Selenium pool) and their rows
+    are streamed into a RowCollector, which drops rows repeated across pages. At most `max_pages`
+    pages (default 100) are read.
+    """
+    pagination = source.pagination
+    mode = pagination.get("mode", "template")
+    max_pages = pagination.get("max_pages", 100)
+    if mode not in PAGINATION_MODES:
+        raise ValueError(f"Unknown pagination mode {mode!r} in source {source.name}. Use one of {', '.join(PAGINATION_MODES)}.")
+    if mode == "template" and not pagination.get("url_template"):
+        raise ValueError(f"Pagination mode 'template' of source {source.name} needs a url_template.")
+
+    start = monotonic()
+    if mode == "scroll":
+        collector = _scroll_pages(source, max_pages, pagination.get("idle_ms", 500))
+    else:
+        if source.engine == "selenium":
+            download = lambda url: _download_page_selenium(source, url)
+        else:
+            download = lambda url: _download_page_http(source, session, url)
+
+        if mode == "template":
+            urls = template_urls(pagination.url_template, pagination.get("start", 1), pagination.get("step", 1), max_pages)
+            pages = prefetch(urls, download, _prefetch_depth(source))
+        else:
+            next_link = lambda html, url: find_next_link(html, url, pagination.get("next_text"))
+            pages = follow_next_links(source.url, download, next_link, max_pages)
+        collector = collect_pages(pages, lambda html: parse_table(html, attrs=source.table_attrs, index=source.table_index), name=source.name)
+
+    app.logger.info(f"\t[{source.name}] {len(collector.rows)} rows from {collector.pages} page(s), {collector.duplicates} repeated row(s) dropped")
+    get_metrics().record(f"pages:{source.name}", monotonic() - start, rows=len(collector.rows), calls=collector.pages)
+    return collector.columns, collector.rows
+
+ENGINES = {
+    "http": _fetch_table_http,
+    "selenium": _fetch_table_selenium,
+}
+
+def get_sources() -> List[DotMap]:
+    """
+    Returns the web sources configured in app.config.sources, or a single source built from
+    app.config.source_url. Each source may define `name`, `url`, `engine`, `table_attrs`,
+    `table_index`, `columns` (mapping of page headers to column names) and `timeout`.
+    Selenium sources may also define `response_url`, a regex matched against the URLs of the
+    responses the page loads: the table is then read from that response body (HTML, or JSON
+    records found at the dotted `response_path`) instead of the rendered DOM.
+    Tables spread over several pages define `pagination` (see fetch_paginated).
+    """
+    sources = app.config.get("sources") or [DotMap(url=app.config.source_url)]
+    default_engine = app.config.get("extraction_engine", "http")
+
+    normalized = []
+    for i, source in enumerate(sources):
+        source = source.toDict() if isinstance(source, DotMap) else dict(source)
+        source.setdefault("name", urlparse(source["url"]).netloc or f"source_{i}")
+        source.setdefault("engine", default_engine)
+        source.setdefault("table_attrs", TABLE_ATTRS)
+        source.setdefault("table_index", 0)
+        source.setdefault("columns", COLUMNS)
+        source.setdefault("timeout", app.config.get("fetch_timeout", 30))
+        source.setdefault("response_url", None)
+        source.setdefault("response_path", None)
+        source.setdefault("pagination", None)
+        if any(source["name"] == other.name for other in normalized):
+            source["name"] = f"{source['name']}#{i}"
+        normalized.append(DotMap(source, _dynamic=False))
+    return normalized
+
+def _select_columns(source: DotMap, columns: List[str], values: List[List[str]]) -> pd.DataFrame:
+    mapping = source.columns.toDict() if isinstance(source.columns, DotMap) else dict(source.columns)
+    df = pd.DataFrame(values, columns=columns)[list(mapping)]
+    df.columns = list(mapping.values())
+    return df
+
+def fetch_source(source: DotMap, session: HttpSession) -> pd.DataFrame:
+    """
+    Fetches the table of a single source and maps its headers to the configured column names.
+
+    :param source: source definition, as returned by get_sources.
+    :param session: shared HttpSession used by the http engine.
+    """
+    cache = get_http_cache() if source.engine == "http" and not source.pagination else None
+    try:
+        if cache is not None:
+            app.logger.info(f"\t[{source.name}] Downloading page...")
+            page = cache.fetch(session, source.url, timeout=source.timeout)
+            variant = hashlib.sha256(repr((source.table_attrs, source.table_index, source.columns)).encode("utf-8")).hexdigest()[:16]
+            if not page.changed:
+                df = cache.load_snapshot(source.url, variant)
+                if df is not None:
+                    app.logger.info(f"\t[{source.name}] Page unchanged ({page.status}), using cached table")
+                    return df
+            columns, values = _fetch_table_http(source, session, html=page.text)
+        elif source.pagination:
+            columns, values = fetch_paginated(source, session)
+        else:
+            columns, values = ENGINES[source.engine](source, session)
+        # a table whose headers do not match the configured columns also triggers the fallback
+        df = _select_columns(source, columns, values)
+    except LookupError as e:
+        if source.engine == "selenium":
+            raise
+        app.logger.warning(f"\t[{source.name}] {e} Falling back to selenium")
+        if source.pagination:
+            columns, values = fetch_paginated(DotMap({**source.toDict(), "engine": "selenium"}, _dynamic=False), session)
+        else:
+            columns, values = _fetch_table_selenium(source)
+        df = _select_columns(source, columns, values)
+
+    if cache is not None and source.engine == "http":
+        cache.save_snapshot(source.url, df, variant)
+    return df
+
+def get_web_dataframe() -> pd.DataFrame:
+    """
+    Fetches every configured web source concurrently and merges them into a single frame.
+
+    Sources are fetched by a BoundedScheduler limited by app.config.max_workers (default 4) and
+    app.config.max_per_host (default 2); transient failures (timeouts, connection and browser errors, HTTP 429/5xx) are
+    retried app.config.fetch_retries times (default 2) with exponential backoff. Rows repeated across sources (e.g. mirrors) are kept once.
+    """
+    try:
+        sources = get_sources()
+        scheduler = BoundedScheduler(
+            max_workers=app.config.get("max_workers", 4),
+            max_per_group=app.config.get("max_per_host", 2),
+            retries=app.config.get("fetch_retries", 2),
+            timeout=app.config.get("fetch_total_timeout"),
+        )
+        app.logger.info(f"\tFetching {len(sources)} source(s)")
+
+        # paginated sources keep up to `prefetch` page downloads in flight each
+        depth = max([_prefetch_depth(source) for source in sources if source.pagination] or [1])
+        with HttpSession(pool_maxsize=scheduler.max_workers * depth) as session:
+            results = scheduler.run(
+                (source.name, urlparse(source.url).netloc, lambda source=source: fetch_source(source, session))
+                for source in sources
+            )
+
+        frames = []
+        for result in results:
+            extra = {"stage": f"fetch:{result.key}", "duration_s": round(result.elapsed, 4), "attempts": result.attempts}
+            if result.ok:
+                app.logger.info(
+                    f"\t[{result.key}] {len(result.value)} rows in {result.elapsed:.2f}s ({result.attempts} attempt(s))",
+                    extra={**extra, "status": "ok", "rows": len(result.value)},
+                )
+                frames.append(result.value)
+            else:
+                app.logger.error(f"\t[{result.key}] Failed: {type(result.error).__name__}: {result.error}", extra={**extra, "status": "error"})
+        if not frames:
+            raise next(result.error for result in results if not result.ok)
+
         # Treating DataFrame
         app.logger.info("\tTreating DataFrame")
-        df = pd.DataFrame(values, columns=columns)[["Estado", "Capital", "Região"]]
-        df.columns = ["estado", "capital", "regiao"]
-        df = df.map(lambda x: x.title() if isinstance(x, str) else x)
-        
+        df = pd.concat(frames, ignore_index=True)
+        df = title_case(df)
+        df = df.drop_duplicates(ignore_index=True)
+
         app.logger.info("\tSuccessful")
         app.logger.info("")
         return df
-    
+
     except Exception as e:
         app.logger.error(f"\n{type(e).__name__} at line {e.__traceback__.tb_lineno} of {__file__}\n")
         traceback.print_exc()
         raise e
 
-def get_file_dataframe() -> pd.DataFrame:
+def _parse_capital_populacao(value) -> Tuple[str, int]:
+    capital, separator, populacao = str(value).partition(":")
+    if not separator:
+        raise ValueError(f"Invalid {FILE_COLUMN} value: {value!r}")
+    return capital, int(populacao.translate(_PUNCTUATION))
+
+def _file_chunk(rows: List[tuple], position: int, others: List[Tuple[int, str]]) -> pd.DataFrame:
+    df = pd.DataFrame({name: [row[i] for row in rows] for i, name in others})
+    capitals, populations = zip(*(_parse_capital_populacao(row[position]) for row in rows))
+    df["capital"] = capitals
+    df["populacao"] = np.fromiter(populations, dtype=np.int64, count=len(rows))
+    return df
+
+def iter_file_dataframes(file_path: str = None, chunksize: int = None, refresh_cache: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Streams the input workbook in typed chunks (capital: str, populacao: int64).
+
+    Rows are read with openpyxl in read-only mode, so memory is bounded by the chunk size plus the
+    set of rows already seen, used to drop duplicates across chunks. Unless app.config.input_cache
+    is false, the parsed chunks are cached next to the input and reused while it is unchanged.
+
+    :param file_path: xlsx file with a "Capital/populacao" column. Defaults to input/PopulaçãoxCapital.xlsx.
+    :param chunksize: rows per chunk. Defaults to app.config.file_chunksize, or 50000.
+    :param refresh_cache: ignore and rebuild the converted-input cache.
+    """
+    file_path = file_path or FILE_PATH
+    chunksize = chunksize or app.config.get("file_chunksize", 50_000)
+
+    if not app.config.get("input_cache", True):
+        return _read_file_chunks(file_path, chunksize)
+    return cached_chunks(file_path, lambda: _read_file_chunks(file_path, chunksize), refresh=refresh_cache, variant=FILE_PARSER_VERSION)
+
+def _read_file_chunks(file_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    app.logger.info(f"\tReading: {os.path.abspath(file_path)}")
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        if FILE_COLUMN not in header:
+            raise KeyError(f"Column {FILE_COLUMN!r} not found in {file_path}")
+        position = header.index(FILE_COLUMN)
+        others = [(i, name) for i, name in enumerate(header) if i != position and name is not None]
+
+        seen = set()
+        batch = []
+        for row in rows:
+            if row in seen or all(value is None for value in row):
+                continue
+            seen.add(row)
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield _file_chunk(batch, position, others)
+                batch = []
+        if batch:
+            yield _file_chunk(batch, position, others)
+    finally:
+        workbook.close()
+
+def get_file_dataframe(file_path: str = None, refresh_cache: bool = False) -> pd.DataFrame:
     try:
-        file_path = os.path.join("..", "input", "PopulaçãoxCapital.xlsx")
-        
-        app.logger.info(f"\tReading: {os.path.abspath(file_path)}")
-        df = pd.read_excel(file_path)
-        
         app.logger.info("\tTreating DataFrame")
-        df.drop_duplicates(inplace=True)
-        df[["capital", "populacao"]] = df["Capital/populacao"].str.split(":", expand=True)
-        df.drop(columns=["Capital/populacao"], inplace=True)
-        df["populacao"] = df["populacao"].str.replace(f"[{string.punctuation}]", "", regex=True).astype(int)
+        df = pd.concat(iter_file_dataframes(file_path, refresh_cache=refresh_cache), ignore_index=True)
         
         app.logger.info("\tSuccessful")
         app.logger.info("")
@@ -55,4 +438,4 @@ def get_file_dataframe() -> pd.DataFrame:
     except Exception as e:
         app.logger.error(f"\n{type(e).__name__} at line {e.__traceback__.tb_lineno} of {__file__}\n")
         traceback.print_exc()
-        raise e
\ No newline at end of file
+        raise e
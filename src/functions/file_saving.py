@@ -1,14 +1,19 @@
-from functools import wraps
-from typing import Callable
+from functions.metrics import get_metrics
+from functions.manifest import ReportManifest, data_fingerprint
+from functions.writers import write_dataframe
+from functools import reduce, wraps
+from typing import Callable, Iterable, Union
 import pandas as pd
-import os, app, pyexcel, traceback
+import app
 
 def log_execution(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         try:
             app.logger.info(f"\tStarting")
-            result = func(*args, **kwargs)
+            with get_metrics().stage(func.__name__) as stage:
+                result = func(*args, **kwargs)
+                stage.rows = len(result) if isinstance(result, pd.DataFrame) else None
             app.logger.info(f"\tSuccess")
             return result
         except Exception as e:
@@ -19,26 +24,101 @@ def log_execution(func):
             app.logger.info(f"")
     return wrapper
 
+class IncrementalTransform:
+    def __init__(self, partial: Callable[[pd.DataFrame], object], merge: Callable[[object, object], object], finalize: Callable[[object], pd.DataFrame]):
+        """
+        A report transform that can be computed over DataFrame chunks, keeping only a small
+        partial result in memory.
+
+        :param partial: computes the partial result of a single chunk.
+        :param merge: combines two partial results.
+        :param finalize: turns the combined partial result into the report DataFrame.
+        """
+        self.partial = partial
+        self.merge = merge
+        self.finalize = finalize
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.finalize(self.partial(df))
+
+    def over_chunks(self, chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        return self.finalize(reduce(self.merge, map(self.partial, chunks)))
+
+def apply_transform(df: Union[pd.DataFrame, Iterable[pd.DataFrame]], transform: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Applies a transform to a DataFrame or to an iterable of DataFrame chunks.
+    Chunks are reduced incrementally when the transform is an IncrementalTransform.
+    """
+    if isinstance(df, pd.DataFrame):
+        return transform(df)
+    if isinstance(transform, IncrementalTransform):
+        return transform.over_chunks(df)
+    return transform(pd.concat(df, ignore_index=True))
+
 @log_execution
-def generate_report(df: pd.DataFrame, transform: Callable[[pd.DataFrame], pd.DataFrame], output_path: str):
+def generate_report(df: Union[pd.DataFrame, Iterable[pd.DataFrame]], transform: Callable[[pd.DataFrame], pd.DataFrame], output_path: str,
+                    manifest: ReportManifest = None, fingerprint: str = None) -> bool:
     """
     Generic function to generate a report.
 
-    :param df: Input DataFrame.
+    :param df: Input DataFrame, or an iterable of DataFrame chunks (e.g. SQLiteTable.read_chunks).
     :param transform: A function that transforms the DataFrame for the report.
     :param output_path: The file path where the report will be saved.
+    :param manifest: When given, the report is skipped if the manifest shows it was already generated
+                     from the same data by the same transform.
+    :param fingerprint: Fingerprint of the input data (e.g. SQLiteTable.fingerprint()). Computed from
+                        the data when omitted.
+    :returns: False when the report was skipped, True when it was written.
     """
-    transformed_df = transform(df)
-    data_dict = transformed_df.to_dict(orient="records")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    pyexcel.save_as(records=data_dict, dest_file_name=output_path)
-    
+    if manifest is not None:
+        if not isinstance(df, pd.DataFrame) and iter(df) is df:
+            df = list(df)
+        fingerprint = fingerprint or data_fingerprint(df)
+        if manifest.is_up_to_date(output_path, fingerprint, transform):
+            app.logger.info(f"\tSkipped, up to date: {output_path}")
+            return False
+
+    transformed_df = apply_transform(df, transform)
+    save_report(transformed_df, output_path)
+    if manifest is not None:
+        manifest.record(output_path, fingerprint, transform)
+    return True
+
+def save_report(df: pd.DataFrame, output_path: str):
+    """
+    Writes a report DataFrame to output_path. The format is given by the file extension
+    (see functions.writers): csv, xlsx, parquet, feather, and xls through pyexcel.
+
+    :param df: Report DataFrame.
+    :param output_path: The file path where the report will be saved.
+    """
+    write_dataframe(df, output_path)
+
+def _add(left: pd.Series, right: pd.Series) -> pd.Series:
+    return left.add(right, fill_value=0)
+
 # Specific transformations for each report
-def most_populated_state_transform(df: pd.DataFrame) -> pd.DataFrame:
-    return df.nlargest(2, "populacao")[["estado", "capital", "populacao"]]
+most_populated_state_transform = IncrementalTransform(
+    partial=lambda df: df.nlargest(2, "populacao")[["estado", "capital", "populacao"]],
+    merge=lambda left, right: pd.concat([left, right]).nlargest(2, "populacao"),
+    finalize=lambda df: df,
+)
+
+regions_and_capitals_transform = IncrementalTransform(
+    partial=lambda df: df.groupby("regiao").size(),
+    merge=_add,
+    finalize=lambda counts: counts.astype(int).rename_axis("regiao").reset_index(name="n_capitais"),
+)
+
+top_3_populated_regions_transform = IncrementalTransform(
+    partial=lambda df: df.groupby("regiao")["populacao"].sum(),
+    merge=_add,
+    finalize=lambda sums: sums.astype("int64").nlargest(3).rename_axis("regiao").reset_index(name="populacao"),
+)
 
-def regions_and_capitals_transform(df: pd.DataFrame) -> pd.DataFrame:
-    return df.groupby("regiao").size().reset_index(name="n_capitais")
+# Transformations over the region_aggregates table (one row per region, see SQLiteEstados.read_region_aggregates)
+def regions_and_capitals_from_aggregates_transform(df: pd.DataFrame) -> pd.DataFrame:
+    return df[["regiao", "n_estados"]].rename(columns={"n_estados": "n_capitais"}).sort_values("regiao").reset_index(drop=True)
 
-def top_3_populated_regions_transform(df: pd.DataFrame) -> pd.DataFrame:
-    return df.groupby("regiao")["populacao"].sum().nlargest(3).reset_index()
\ No newline at end of file
+def top_3_populated_regions_from_aggregates_transform(df: pd.DataFrame) -> pd.DataFrame:
+    return df.nlargest(3, "populacao")[["regiao", "populacao"]].reset_index(drop=True)
@@ -0,0 +1,201 @@
+from importlib.util import find_spec
+from typing import Callable, Iterable, Iterator
+import pandas as pd
+import hashlib, json, os, pickle, app
+
+def _has_pyarrow() -> bool:
+    # checked without importing it: pyarrow is only loaded when a cache is actually read or written
+    return find_spec("pyarrow") is not None
+
+def _arrow_schema(table):
+    """
+    Schema every chunk is written with: the first chunk's, with all-null columns widened to string.
+    """
+    import pyarrow as pa
+
+    return pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in table.schema
+    ]).remove_metadata()
+
+def _conform(table, schema):
+    """
+    Casts a chunk to the cache schema, or returns None when that would change its values
+    (a column whose type differs other than by being all null).
+    """
+    import pyarrow as pa
+
+    if table.schema.names != schema.names:
+        return None
+    for field, target in zip(table.schema, schema):
+        if field.type != target.type and not pa.types.is_null(field.type):
+            return None
+    return table.cast(schema)
+
+def _content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ConvertedInputCache:
+    def __init__(self, source_path: str, variant: str = "1", use_arrow: bool = None):
+        """
+        Keeps the cleaned chunks of an input file next to it, so later runs skip parsing the source.
+
+        The cache is valid while the source has the same path, size and mtime; when only the
+        mtime changed (e.g. the file was copied again) the content hash decides. Chunks are stored
+        as an Arrow IPC (Feather v2) file read back memory-mapped when pyarrow is installed, or
+        as a stream of pickled DataFrames otherwise.
+
+        :param source_path: Input file being cached.
+        :param variant: Version of the parsing logic; changing it invalidates existing caches.
+        :param use_arrow: Force (True) or disable (False) the Arrow format. Defaults to whether pyarrow is available.
+        """
+        self.source_path = source_path
+        self.variant = variant
+        self.use_arrow = _has_pyarrow() if use_arrow is None else use_arrow
+        if self.use_arrow and not _has_pyarrow():
+            raise ImportError("pyarrow is required for the Arrow input cache.")
+
+        dirname, filename = os.path.split(source_path)
+        extension = "arrow" if self.use_arrow else "pkl"
+        self.data_path = os.path.join(dirname, f".{filename}.cache.{extension}")
+        self.meta_path = os.path.join(dirname, f".{filename}.cache.json")
+
+    def _source_meta(self, content_hash: str = None) -> dict:
+        stat = os.stat(self.source_path)
+        return {
+            "path": os.path.abspath(self.source_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": content_hash,
+            "variant": self.variant,
+            "format": os.path.splitext(self.data_path)[1][1:],
+        }
+
+    def is_valid(self) -> bool:
+        """
+        Checks whether the cached chunks still correspond to the source file.
+        """
+        try:
+            with open(self.meta_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if not os.path.isfile(self.data_path):
+            return False
+
+        current = self._source_meta()
+        same_kind = all(cached.get(key) == current[key] for key in ("path", "variant", "format"))
+        if not same_kind or cached.get("size") != current["size"]:
+            return False
+        if cached.get("mtime_ns") == current["mtime_ns"]:
+            return True
+
+        # same size, different mtime: fall back to the content hash
+        if cached.get("sha256") != _content_hash(self.source_path):
+            return False
+        cached["mtime_ns"] = current["mtime_ns"]
+        self._write_meta(cached)
+        return True
+
+    def _write_meta(self, meta: dict):
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    def load(self) -> Iterator[pd.DataFrame]:
+        """
+        Yields the cached chunks.
+        """
+        if self.use_arrow:
+            import pyarrow as pa
+            import pyarrow.ipc
+
+            with pa.memory_map(self.data_path) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield reader.get_batch(i).to_pandas()
+        else:
+            with open(self.data_path, "rb") as f:
+                while True:
+                    try:
+                        yield pickle.load(f)
+                    except EOFError:
+                        break
+
+    def store(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Passes the chunks through while writing them to the cache. The cache only becomes valid
+        once every chunk was consumed; a source without chunks, or whose chunks cannot share one
+        Arrow schema, is passed through without being cached.
+        """
+        if self.use_arrow:
+            import pyarrow as pa
+            import pyarrow.ipc
+
+        tmp_path = self.data_path + ".tmp"
+        source_meta = self._source_meta(_content_hash(self.source_path))
+        writer = None
+        schema = None
+        caching = True
+        written = 0
+        completed = False
+        try:
+            with open(tmp_path, "wb") as f:
+                try:
+                    for chunk in chunks:
+                        if caching and self.use_arrow:
+                            table = pa.Table.from_pandas(chunk, preserve_index=False)
+                            if writer is None:
+                                schema = _arrow_schema(table)
+                                writer = pa.ipc.new_file(f, schema)
+                            table = _conform(table, schema)
+                            if table is None:
+                                app.logger.warning(f"\tInput chunks of {self.source_path} change column types, not caching them")
+                                caching = False
+                            else:
+                                writer.write_table(table)
+                                written += 1
+                        elif caching:
+                            pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+                            written += 1
+                        yield chunk
+                finally:
+                    if writer is not None:
+                        writer.close()
+            completed = caching and written > 0
+        finally:
+            if completed:
+                os.replace(tmp_path, self.data_path)
+                self._write_meta(source_meta)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def invalidate(self):
+        """
+        Removes the cached chunks.
+        """
+        for path in (self.data_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+def cached_chunks(source_path: str, read: Callable[[], Iterable[pd.DataFrame]], refresh: bool = False, variant: str = "1") -> Iterator[pd.DataFrame]:
+    """
+    Yields the chunks of source_path from the converted-input cache when it is valid, or reads
+    them with `read` and stores them otherwise.
+
+    :param source_path: Input file being cached.
+    :param read: Callable that parses the source into chunks.
+    :param refresh: Ignore and rebuild the cache.
+    :param variant: Version of the parsing logic.
+    """
+    cache = ConvertedInputCache(source_path, variant=variant)
+    if not refresh and cache.is_valid():
+        app.logger.info(f"\tUsing converted input cache: {os.path.abspath(cache.data_path)}")
+        yield from cache.load()
+        return
+    if refresh:
+        cache.invalidate()
+    yield from cache.store(read())
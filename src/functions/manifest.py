@@ -0,0 +1,92 @@
+from typing import Callable, Iterable, Union
+from datetime import datetime
+import pandas as pd
+import hashlib, json, marshal, os, threading
+
+def _callables(transform: Callable) -> list:
+    parts = [getattr(transform, name) for name in ("partial", "merge", "finalize") if callable(getattr(transform, name, None))]
+    return parts or [transform]
+
+def transform_identity(transform: Callable) -> str:
+    """
+    Identifies a transform by its name and the bytecode of the functions it is built from,
+    so editing a transform invalidates the reports generated by it.
+    """
+    digest = hashlib.sha256()
+    for func in _callables(transform):
+        digest.update(f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}".encode("utf-8"))
+        code = getattr(func, "__code__", None)
+        if code is not None:
+            digest.update(marshal.dumps(code))
+    return digest.hexdigest()
+
+def data_fingerprint(df: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> str:
+    """
+    Hashes the content of a DataFrame, or of a stream of chunks, in a single vectorized pass.
+    """
+    digest = hashlib.sha256()
+    for chunk in ([df] if isinstance(df, pd.DataFrame) else df):
+        digest.update(",".join(map(str, chunk.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ReportManifest:
+    def __init__(self, path: str):
+        """
+        Records, for each generated report, the fingerprint of its input data, the identity of its
+        transform and the hash of the written file. A report whose three values still match is
+        up to date and does not need to be generated again.
+
+        :param path: JSON file where the manifest is kept, e.g. output/.manifest.json
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._entries = {}
+
+    def _key(self, output_path: str) -> str:
+        return os.path.relpath(os.path.abspath(output_path), os.path.dirname(os.path.abspath(self.path)))
+
+    def is_up_to_date(self, output_path: str, fingerprint: str, transform: Callable) -> bool:
+        """
+        Checks whether output_path was generated from the same data by the same transform and
+        has not been modified or removed since.
+        """
+        entry = self._entries.get(self._key(output_path))
+        if entry is None or fingerprint is None:
+            return False
+        if entry["input"] != fingerprint or entry["transform"] != transform_identity(transform):
+            return False
+        return os.path.isfile(output_path) and file_hash(output_path) == entry["output"]
+
+    def record(self, output_path: str, fingerprint: str, transform: Callable):
+        """
+        Registers a freshly written report and saves the manifest.
+        """
+        with self._lock:
+            self._entries[self._key(output_path)] = {
+                "input": fingerprint,
+                "transform": transform_identity(transform),
+                "output": file_hash(output_path),
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self.save()
+
+    def save(self):
+        dirname = os.path.dirname(self.path)
+        if dirname != "":
+            os.makedirs(dirname, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
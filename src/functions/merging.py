@@ -0,0 +1,98 @@
+from typing import Iterable, Iterator, List
+import numpy as np
+import pandas as pd
+import app
+
+_COMBINING_MARKS = "[\u0300-\u036f]"
+# unmatched keys kept and logged as a sample, so memory and log lines stay bounded on large inputs
+UNMATCHED_SAMPLE = 20
+
+def _sample(keys: List, total: int) -> str:
+    sample = ", ".join(map(str, keys[:UNMATCHED_SAMPLE]))
+    return f"{sample}, ..." if total > UNMATCHED_SAMPLE else sample
+
+def normalize_keys(keys: pd.Series) -> pd.Series:
+    """
+    Normalizes join keys with vectorized string operations: accents are folded, whitespace is
+    collapsed and trimmed, and case is folded, so "  Aracajú" and "ARACAJU" become "aracaju".
+    """
+    return (
+        keys.astype("string")
+        .str.normalize("NFKD")
+        .str.replace(_COMBINING_MARKS, "", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+        .str.casefold()
+    )
+
+def title_case(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Title-cases every string cell of a DataFrame, one column at a time.
+    """
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        titled = df[column].str.title()
+        df[column] = titled.where(titled.notna(), df[column])
+    return df
+
+class HashJoin:
+    def __init__(self, build: pd.DataFrame, on: str, name: str = "left"):
+        """
+        Inner join of a small frame (the build side) against frames streamed in chunks (the probe side).
+
+        Keys are normalized with normalize_keys and coded once as integers on the build side; each
+        probe chunk is then joined on those codes. The original key column of the build side is
+        kept in the output. Keys that find no match are reported on both sides instead of being
+        dropped silently; on the probe side only their count and the first UNMATCHED_SAMPLE keys are kept.
+
+        :param build: Frame held in memory, e.g. the web table.
+        :param on: Key column present in both sides.
+        :param name: Name of the build side in the logs.
+        """
+        self.on = on
+        self.name = name
+        codes, self._uniques = pd.factorize(normalize_keys(build[on]), use_na_sentinel=True)
+        self._build = build.assign(_key=codes)[codes >= 0]
+        self._index = pd.Index(self._uniques)
+        self._matched = np.zeros(len(self._uniques), dtype=bool)
+        self.unmatched_probe: List[str] = []
+        self.unmatched_probe_count = 0
+
+    def probe(self, chunk: pd.DataFrame, name: str = "right") -> pd.DataFrame:
+        """
+        Joins one probe chunk and records its unmatched keys.
+        """
+        codes = self._index.get_indexer(normalize_keys(chunk[self.on]))
+        hits = codes >= 0
+        self._matched[codes[hits]] = True
+
+        missing = chunk.loc[~hits, self.on]
+        if len(missing):
+            sample = missing.iloc[:UNMATCHED_SAMPLE].tolist()
+            self.unmatched_probe_count += len(missing)
+            self.unmatched_probe.extend(sample[:UNMATCHED_SAMPLE - len(self.unmatched_probe)])
+            app.logger.warning(f"\t{len(missing)} {name} key(s) without match in {self.name} (sample: {_sample(sample, len(missing))})")
+
+        probe = chunk.drop(columns=[self.on])[hits].assign(_key=codes[hits])
+        return self._build.merge(probe, on="_key", how="inner", sort=False).drop(columns=["_key"])
+
+    def run(self, chunks: Iterable[pd.DataFrame], name: str = "right") -> Iterator[pd.DataFrame]:
+        """
+        Probes every chunk, then reports the build keys that never matched.
+        """
+        for chunk in chunks:
+            yield self.probe(chunk, name)
+        self.log_unmatched(name)
+
+    def log_unmatched(self, name: str = "right"):
+        """
+        Logs the build keys that never matched a probe chunk.
+        """
+        unmatched = self.unmatched_build
+        if unmatched:
+            app.logger.warning(f"\t{len(unmatched)} {self.name} key(s) without match in {name} (sample: {_sample(unmatched, len(unmatched))})")
+
+    @property
+    def unmatched_build(self) -> List[str]:
+        unmatched = self._build[~self._matched[self._build["_key"].to_numpy()]]
+        return unmatched[self.on].tolist()
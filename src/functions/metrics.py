@@ -0,0 +1,261 @@
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from time import perf_counter, process_time
+from typing import Dict, Iterable, Iterator, List
+import cProfile, csv, json, os, sys, threading, tracemalloc, app
+
+PROFILE_MODES = ("cpu", "memory")
+
+def _memory_info():
+    import psutil
+    return psutil.Process().memory_info()
+
+def _peak_rss() -> int:
+    """
+    High-water mark of the process resident memory, in bytes.
+    """
+    memory = _memory_info()
+    if hasattr(memory, "peak_wset"):
+        return memory.peak_wset
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _rows(value) -> int:
+    # pandas is not imported here, so instrumenting a stage does not load it
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+class StageMetrics:
+    def __init__(self, name: str):
+        """
+        Accumulated measurements of one pipeline stage. A stage entered several times
+        (e.g. once per chunk) adds up its times and rows.
+        """
+        self.name = name
+        self.calls = 0
+        self.wall_s = 0.0
+        self.cpu_s = None
+        self.rows = None
+        self.rss_mb = None
+        self.peak_rss_mb = None
+        self.traced_peak_mb = None
+
+    def add_rows(self, rows: int):
+        if rows is not None:
+            self.rows = (self.rows or 0) + rows
+
+    def as_dict(self) -> dict:
+        def rounded(value, digits):
+            return None if value is None else round(value, digits)
+        return {
+            "stage": self.name,
+            "calls": self.calls,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": rounded(self.cpu_s, 4),
+            "rows": self.rows,
+            "rss_mb": rounded(self.rss_mb, 1),
+            "peak_rss_mb": rounded(self.peak_rss_mb, 1),
+            "traced_peak_mb": rounded(self.traced_peak_mb, 1),
+        }
+
+class StageHandle:
+    def __init__(self, rows: int = None):
+        """
+        Yielded by MetricsRecorder.stage, so the stage body can report how many rows it handled.
+        """
+        self.rows = rows
+
+class MetricsRecorder:
+    def __init__(self, path: str = None, profile: str = None, profile_dir: str = None):
+        """
+        Records wall time, CPU time, memory and row counts of the pipeline stages.
+
+        :param path: .json or .csv file the metrics of each run are appended to. Nothing is written when None.
+        :param profile: "cpu" keeps a cProfile per stage, "memory" a tracemalloc snapshot per stage.
+        :param profile_dir: Directory for the profile dumps. Defaults to a timestamped folder next to path.
+        """
+        if profile is not None and profile not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{profile}'. Available: {', '.join(PROFILE_MODES)}")
+        self.path = path
+        self.profile = profile
+        self.started_at = datetime.now()
+        if profile is not None and profile_dir is None:
+            root = os.path.dirname(path) if path else os.path.join(".", "__logs__")
+            profile_dir = os.path.join(root, "profile", self.started_at.strftime(r"%Y-%m-%d_%H-%M-%S"))
+        self.profile_dir = profile_dir
+        self.stages: Dict[str, StageMetrics] = {}
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._snapshots: Dict[str, tracemalloc.Snapshot] = {}
+        self._active = threading.local()
+        self._lock = threading.Lock()
+
+    def _start_profile(self, name: str):
+        if self.profile == "cpu":
+            profile = self._profiles.setdefault(name, cProfile.Profile())
+            try:
+                profile.enable()
+                return profile
+            except ValueError:
+                # another profiler is already active (nested stage)
+                return None
+        if self.profile == "memory":
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            return True
+        return None
+
+    def _stop_profile(self, name: str, profile, metrics: StageMetrics):
+        if self.profile == "cpu" and profile is not None:
+            profile.disable()
+        elif self.profile == "memory":
+            traced_peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            metrics.traced_peak_mb = max(metrics.traced_peak_mb or 0.0, traced_peak)
+            self._snapshots[name] = tracemalloc.take_snapshot()
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None) -> Iterator[StageHandle]:
+        """
+        Measures the block as the stage `name`.
+
+            with metrics.stage("upsert", rows=len(df)):
+                table.upsert_df(df)
+
+        :param rows: Rows handled by the stage. Can also be set on the yielded handle.
+        """
+        handle = StageHandle(rows)
+        depth = getattr(self._active, "depth", 0)
+        self._active.depth = depth + 1
+        profile = self._start_profile(name) if depth == 0 else None
+        wall, cpu = perf_counter(), process_time()
+        try:
+            yield handle
+        finally:
+            wall, cpu = perf_counter() - wall, process_time() - cpu
+            self._active.depth = depth
+            with self._lock:
+                metrics = self.stages.setdefault(name, StageMetrics(name))
+                if depth == 0:
+                    self._stop_profile(name, profile, metrics)
+                metrics.calls += 1
+                metrics.wall_s += wall
+                metrics.cpu_s = (metrics.cpu_s or 0.0) + cpu
+                metrics.add_rows(handle.rows)
+                metrics.rss_mb = _memory_info().rss / 1024 ** 2
+                metrics.peak_rss_mb = max(_peak_rss() / 1024 ** 2, metrics.rss_mb, metrics.peak_rss_mb or 0.0)
+            # structured event, written only to the JSON log (see app.loggers.EventFilter)
+            app.logger.info(
+                f"stage {name}",
+                extra={"event": True, "stage": name, "duration_s": round(wall, 4), "cpu_s": round(cpu, 4), "rows": handle.rows},
+            )
+
+    def track(self, name: str = None):
+        """
+        Decorator that measures every call of a function as a stage (default: the function name).
+        Rows are taken from the length of a returned DataFrame.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or func.__name__) as handle:
+                    result = func(*args, **kwargs)
+                    handle.rows = _rows(result)
+                    return result
+            return wrapper
+        return decorator
+
+    def iterate(self, name: str, chunks: Iterable["pd.DataFrame"]) -> Iterator["pd.DataFrame"]:
+        """
+        Measures the production of each chunk of an iterable as the stage `name`.
+        """
+        iterator = iter(chunks)
+        while True:
+            with self.stage(name) as handle:
+                chunk = next(iterator, None)
+                handle.rows = _rows(chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+    def record(self, name: str, wall_s: float, rows: int = None, calls: int = 1):
+        """
+        Adds a measurement taken elsewhere (e.g. report timings from the ReportEngine).
+        """
+        with self._lock:
+            metrics = self.stages.setdefault(name, StageMetrics(name))
+            metrics.calls += calls
+            metrics.wall_s += wall_s
+            metrics.add_rows(rows)
+
+    def summary(self) -> List[dict]:
+        with self._lock:
+            return [metrics.as_dict() for metrics in self.stages.values()]
+
+    def log(self):
+        for row in self.summary():
+            parts = [f"wall {row['wall_s']:.3f}s"]
+            if row["cpu_s"] is not None:
+                parts.append(f"cpu {row['cpu_s']:.3f}s")
+            if row["rows"] is not None:
+                parts.append(f"{row['rows']} rows")
+            if row["rss_mb"] is not None:
+                parts.append(f"rss {row['rss_mb']:.0f}MB (peak {row['peak_rss_mb']:.0f}MB)")
+            if row["traced_peak_mb"] is not None:
+                parts.append(f"traced peak {row['traced_peak_mb']:.1f}MB")
+            app.logger.info(f"\t{row['stage']}: {' | '.join(parts)}")
+
+    def save(self):
+        """
+        Appends this run to the metrics file and writes the profile dumps.
+        """
+        run_at = self.started_at.isoformat(timespec="seconds")
+        rows = self.summary()
+        if self.path:
+            dirname = os.path.dirname(self.path)
+            if dirname != "":
+                os.makedirs(dirname, exist_ok=True)
+            if self.path.lower().endswith(".csv"):
+                new_file = not os.path.isfile(self.path)
+                with open(self.path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=["run_at", *StageMetrics("").as_dict()])
+                    if new_file:
+                        writer.writeheader()
+                    writer.writerows({"run_at": run_at, **row} for row in rows)
+            else:
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        runs = json.load(f)
+                except (FileNotFoundError, ValueError):
+                    runs = []
+                runs.append({"run_at": run_at, "stages": rows})
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(runs, f, indent=2)
+
+        if self.profile_dir and (self._profiles or self._snapshots):
+            os.makedirs(self.profile_dir, exist_ok=True)
+            for name, profile in self._profiles.items():
+                profile.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+            for name, snapshot in self._snapshots.items():
+                with open(os.path.join(self.profile_dir, f"{name}.tracemalloc.txt"), "w", encoding="utf-8") as f:
+                    f.writelines(f"{stat}\n" for stat in snapshot.statistics("lineno")[:50])
+            app.logger.info(f"\tProfiles written to {os.path.abspath(self.profile_dir)}")
+
+_metrics = MetricsRecorder()
+
+def configure_metrics(path: str = None, profile: str = None, profile_dir: str = None) -> MetricsRecorder:
+    """
+    Replaces the process-wide recorder returned by get_metrics.
+    """
+    global _metrics
+    _metrics = MetricsRecorder(path, profile, profile_dir)
+    return _metrics
+
+def get_metrics() -> MetricsRecorder:
+    """
+    Returns the process-wide recorder (one that writes nothing until configure_metrics is called).
+    """
+    return _metrics
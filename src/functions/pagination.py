@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+import app
+
+PAGINATION_MODES = ("template", "next", "scroll")
+
+class RowCollector:
+    def __init__(self):
+        """
+        Accumulates the rows of consecutive pages into a single table as they arrive. Each distinct
+        row is kept once, so overlapping pages or a site that repeats its last page for out-of-range
+        page numbers do not duplicate rows.
+        """
+        self.columns: List[str] = None
+        self.rows: List[list] = []
+        self.pages = 0
+        self.duplicates = 0
+        self._seen = set()
+
+    def add(self, columns: List[str], rows: List[list]) -> int:
+        """
+        Appends the rows of one page that were not seen before and returns how many there were.
+        Pages without a header row reuse the columns of the first page; pages with the same
+        columns in another order are realigned.
+        """
+        if self.columns is None:
+            self.columns = list(columns)
+        elif columns and list(columns) != self.columns:
+            if sorted(columns) != sorted(self.columns):
+                raise ValueError(f"Page columns {list(columns)} differ from the first page columns {self.columns}.")
+            order = [list(columns).index(column) for column in self.columns]
+            rows = [[row[i] for i in order] for row in rows]
+
+        new = 0
+        for row in rows:
+            key = tuple(row)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            self.rows.append(row)
+            new += 1
+        self.pages += 1
+        self.duplicates += len(rows) - new
+        return new
+
+def template_urls(template: str, start: int = 1, step: int = 1, max_pages: int = 100) -> Iterator[str]:
+    """
+    Yields the page URLs of a page-number template such as "https://host/list?page={page}".
+    """
+    return (template.format(page=start + i * step) for i in range(max_pages))
+
+def prefetch(urls: Iterable[str], download: Callable[[str], Any], depth: int = 4) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields (url, download(url)) in order while keeping up to `depth` downloads running ahead in a
+    thread pool, so the next pages are on their way while the current one is parsed. Closing the
+    generator cancels the downloads that have not started.
+    """
+    urls = iter(urls)
+    executor = ThreadPoolExecutor(max_workers=max(1, depth))
+    pending = deque((url, executor.submit(download, url)) for url in islice(urls, max(1, depth)))
+    try:
+        while pending:
+            url, future = pending.popleft()
+            content = future.result()
+            pending.extend((following, executor.submit(download, following)) for following in islice(urls, 1))
+            yield url, content
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def follow_next_links(url: str, download: Callable[[str], Any], next_link: Callable[[Any, str], str], max_pages: int = 100) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields (url, download(url)) following "next" links from `url`. Each page is searched for its
+    next link first, and that page is downloaded in the background while the current one is parsed;
+    URLs already visited end the walk.
+
+    :param next_link: callable (content, url) returning the absolute URL of the next page, or None.
+    """
+    visited = {url}
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(download, url)
+        while future is not None:
+            content = future.result()
+            following = next_link(content, url) if content is not None else None
+            future = None
+            if following and following not in visited and len(visited) < max_pages:
+                visited.add(following)
+                future = executor.submit(download, following)
+            yield url, content
+            url = following
+
+def collect_pages(pages: Iterator[Tuple[str, Any]], parse: Callable[[Any], Tuple[List[str], List[list]]], collector: RowCollector = None, name: str = "") -> RowCollector:
+    """
+    Parses pages as they arrive and streams their rows into a RowCollector. The listing ends at the
+    first page that is missing (content None), has no table rows or only repeats rows already seen.
+
+    :param pages: iterator of (url, content), e.g. from prefetch or follow_next_links.
+    :param parse: callable returning (columns, rows) for a page content; LookupError means no table.
+    """
+    collector = collector or RowCollector()
+    with closing(pages):
+        for url, content in pages:
+            try:
+                if content is None:
+                    raise LookupError(f"Page {url} not found.")
+                columns, rows = parse(content)
+            except LookupError:
+                # a missing first page is an error; a missing later page is the end of the listing
+                if collector.pages == 0:
+                    raise
+                columns, rows = [], []
+            if not rows:
+                app.logger.debug(f"\t[{name}] {url}: no rows, end of listing")
+                break
+            new = collector.add(columns, rows)
+            app.logger.debug(f"\t[{name}] {url}: {new} new row(s)")
+            if not new:
+                app.logger.debug(f"\t[{name}] {url}: only repeated rows, end of listing")
+                break
+    return collector
@@ -0,0 +1,200 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functions.file_saving import IncrementalTransform, save_report
+from functions.manifest import ReportManifest, data_fingerprint
+from typing import Callable, Dict, Iterable, List, Union
+from time import perf_counter
+import pandas as pd
+import app
+
+DEFAULT_SOURCE = "default"
+
+class ReportJob:
+    def __init__(self, name: str, transform: Callable[[pd.DataFrame], pd.DataFrame], output_path: str, source: str = DEFAULT_SOURCE):
+        """
+        A report to be generated by the ReportEngine.
+
+        :param name: Report name, used in logs and timings.
+        :param transform: A function that transforms the DataFrame for the report.
+        :param output_path: The file path where the report will be saved.
+        :param source: Name of the input the transform is applied to (see ReportEngine.run).
+        """
+        self.name = name
+        self.transform = transform
+        self.output_path = output_path
+        self.source = source
+
+class ReportResult:
+    def __init__(self, job: ReportJob, rows: int = 0, transform_s: float = 0.0, write_s: float = 0.0, error: BaseException = None, skipped: bool = False):
+        self.job = job
+        self.skipped = skipped
+        self.rows = rows
+        self.transform_s = transform_s
+        self.write_s = write_s
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def as_dict(self) -> dict:
+        return {
+            "report": self.job.name,
+            "output_path": self.job.output_path,
+            "skipped": self.skipped,
+            "rows": self.rows,
+            "transform_s": round(self.transform_s, 4),
+            "write_s": round(self.write_s, 4),
+            "error": None if self.error is None else f"{type(self.error).__name__}: {self.error}",
+        }
+
+def _timed_save(df: pd.DataFrame, output_path: str) -> float:
+    start = perf_counter()
+    save_report(df, output_path)
+    return perf_counter() - start
+
+class ReportEngine:
+    def __init__(self, max_workers: int = 4, use_processes: bool = False, manifest: ReportManifest = None):
+        """
+        Generates a registry of reports from one shared input.
+
+        Each distinct transform is computed once; when the input is a stream of chunks and every
+        transform is an IncrementalTransform, all of them are reduced in a single pass over the
+        chunks. The outputs are then written concurrently.
+
+        :param max_workers: Maximum number of reports written at the same time.
+        :param use_processes: Write in a process pool instead of a thread pool (useful for
+                              CPU-bound writers such as xls).
+        :param manifest: When given, reports already generated from the same data by the same
+                         transform are skipped, and written reports are recorded in it.
+        """
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.manifest = manifest
+        self.jobs: List[ReportJob] = []
+
+    def register(self, name: str, transform: Callable[[pd.DataFrame], pd.DataFrame], output_path: str, source: str = DEFAULT_SOURCE) -> "ReportEngine":
+        """
+        Adds a report to the registry.
+        """
+        self.jobs.append(ReportJob(name, transform, output_path, source))
+        return self
+
+    def _compute(self, df: Union[pd.DataFrame, Iterable[pd.DataFrame]], jobs: List[ReportJob]) -> Dict[int, tuple]:
+        """
+        Computes every distinct transform of the jobs over one input.
+        Returns {id(transform): (result or exception, elapsed)}.
+        """
+        transforms = list({id(job.transform): job.transform for job in jobs}.values())
+        if not transforms:
+            return {}
+        results = {}
+
+        if not isinstance(df, pd.DataFrame) and all(isinstance(t, IncrementalTransform) for t in transforms):
+            partials = {id(t): None for t in transforms}
+            elapsed = {id(t): 0.0 for t in transforms}
+            for chunk in df:
+                for t in transforms:
+                    if id(t) in results:
+                        # this transform already failed on an earlier chunk
+                        continue
+                    start = perf_counter()
+                    try:
+                        partial = t.partial(chunk)
+                        partials[id(t)] = partial if partials[id(t)] is None else t.merge(partials[id(t)], partial)
+                    except Exception as e:
+                        results[id(t)] = (e, elapsed[id(t)] + perf_counter() - start)
+                    elapsed[id(t)] += perf_counter() - start
+            for t in transforms:
+                if id(t) in results:
+                    continue
+                start = perf_counter()
+                try:
+                    results[id(t)] = (t.finalize(partials[id(t)]), elapsed[id(t)] + perf_counter() - start)
+                except Exception as e:
+                    results[id(t)] = (e, elapsed[id(t)])
+            return results
+
+        if not isinstance(df, pd.DataFrame):
+            df = pd.concat(df, ignore_index=True)
+        for t in transforms:
+            start = perf_counter()
+            try:
+                results[id(t)] = (t(df), perf_counter() - start)
+            except Exception as e:
+                results[id(t)] = (e, perf_counter() - start)
+        return results
+
+    def run(self, df: Union[pd.DataFrame, Iterable[pd.DataFrame]], raise_errors: bool = True, fingerprint: str = None) -> List[ReportResult]:
+        """
+        Computes and writes every registered report.
+
+        :param df: Input DataFrame, or an iterable of DataFrame chunks (e.g. SQLiteTable.read_chunks).
+                   Jobs registered with different sources take a dict {source: input}.
+        :param raise_errors: Re-raise the first error after all reports were attempted.
+        :param fingerprint: Fingerprint of the data behind all inputs (e.g. SQLiteTable.fingerprint()),
+                            used with the manifest. Computed from the inputs when omitted.
+        :returns: One ReportResult per job, in registration order, with rows and timings.
+        """
+        inputs = dict(df) if isinstance(df, dict) else {DEFAULT_SOURCE: df}
+        for source, data in inputs.items():
+            if not isinstance(data, pd.DataFrame) and iter(data) is data:
+                inputs[source] = list(data)
+
+        pending = self.jobs
+        if self.manifest is not None:
+            if fingerprint is None:
+                fingerprint = data_fingerprint(
+                    chunk for source in sorted(inputs) for chunk in ([inputs[source]] if isinstance(inputs[source], pd.DataFrame) else inputs[source])
+                )
+            pending = [job for job in self.jobs if not self.manifest.is_up_to_date(job.output_path, fingerprint, job.transform)]
+
+        computed = {}
+        for source in dict.fromkeys(job.source for job in pending):
+            jobs = [job for job in pending if job.source == source]
+            computed.update({(source, key): value for key, value in self._compute(inputs[source], jobs).items()})
+        results = []
+        executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+
+        with executor_class(max_workers=self.max_workers) as executor:
+            futures = []
+            for job in self.jobs:
+                if job not in pending:
+                    results.append(ReportResult(job, skipped=True))
+                    futures.append(None)
+                    continue
+                value, transform_s = computed[(job.source, id(job.transform))]
+                result = ReportResult(job, transform_s=transform_s)
+                results.append(result)
+                if isinstance(value, Exception):
+                    result.error = value
+                    futures.append(None)
+                else:
+                    result.rows = len(value)
+                    futures.append(executor.submit(_timed_save, value, job.output_path))
+
+            for result, future in zip(results, futures):
+                if future is None:
+                    continue
+                try:
+                    result.write_s = future.result()
+                    if self.manifest is not None:
+                        self.manifest.record(result.job.output_path, fingerprint, result.job.transform)
+                except Exception as e:
+                    result.error = e
+
+        for result in results:
+            extra = {"stage": f"report:{result.job.name}", "output_path": result.job.output_path}
+            if result.skipped:
+                app.logger.info(f"\t{result.job.name}: skipped, up to date -> {result.job.output_path}", extra={**extra, "status": "skipped"})
+            elif result.ok:
+                app.logger.info(
+                    f"\t{result.job.name}: {result.rows} rows | transform {result.transform_s:.3f}s | write {result.write_s:.3f}s -> {result.job.output_path}",
+                    extra={**extra, "status": "ok", "rows": result.rows, "duration_s": round(result.transform_s + result.write_s, 4)},
+                )
+            else:
+                app.logger.error(f"\t{result.job.name}: {type(result.error).__name__}: {result.error}", extra={**extra, "status": "error"})
+
+        failed = [result for result in results if not result.ok]
+        if failed and raise_errors:
+            raise failed[0].error
+        return results
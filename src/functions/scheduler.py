@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+from time import sleep, monotonic
+import sys, threading, app
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether an error is worth retrying: timeouts and connection errors, selenium WebDriver failures,
+    and HTTP responses with status 429 or 5xx. Other requests errors (4xx, and connection errors or
+    RetryError raised after HttpSession's adapter already retried) are not. The requests and selenium
+    modules are only consulted when already loaded (a task cannot raise their exceptions otherwise),
+    so the scheduler does not import them.
+    """
+    requests = sys.modules.get("requests")
+    if requests is not None and isinstance(error, requests.RequestException):
+        response = getattr(error, "response", None)
+        return isinstance(error, requests.HTTPError) and response is not None and (
+            response.status_code == 429 or response.status_code >= 500
+        )
+    selenium_exceptions = sys.modules.get("selenium.common.exceptions")
+    if selenium_exceptions is not None and isinstance(error, selenium_exceptions.WebDriverException):
+        return True
+    return isinstance(error, (TimeoutError, ConnectionError))
+
+class TaskResult:
+    def __init__(self, key: Hashable, value: Any = None, error: BaseException = None, attempts: int = 0, elapsed: float = 0.0):
+        self.key = key
+        self.value = value
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class BoundedScheduler:
+    def __init__(self, max_workers: int = 4, max_per_group: int = 2, retries: int = 2, backoff: float = 1.0, timeout: float = None):
+        """
+        Runs callables concurrently in a thread pool, with a global worker limit, a per-group
+        (e.g. per-host) concurrency limit and retry with exponential backoff. Only transient
+        errors (see is_transient) are retried; any other exception fails the task at once.
+
+        :param max_workers: maximum number of tasks running at the same time.
+        :param max_per_group: maximum number of tasks of the same group running at the same time.
+        :param retries: how many times a failed task is retried.
+        :param backoff: delay (in seconds) before the first retry, doubled on each subsequent retry.
+        :param timeout: overall time limit (in seconds) to wait for all tasks. None waits forever.
+        """
+        self.max_workers = max_workers
+        self.max_per_group = max_per_group
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._groups: Dict[Hashable, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, group: Hashable) -> threading.BoundedSemaphore:
+        with self._lock:
+            if group not in self._groups:
+                self._groups[group] = threading.BoundedSemaphore(self.max_per_group)
+            return self._groups[group]
+
+    def _run(self, key: Hashable, group: Hashable, func: Callable[[], Any]) -> TaskResult:
+        result = TaskResult(key)
+        start = monotonic()
+        delay = self.backoff
+        for attempt in range(1, self.retries + 2):
+            result.attempts = attempt
+            try:
+                with self._semaphore(group):
+                    result.value = func()
+                result.error = None
+                break
+            except Exception as e:
+                result.error = e
+                if not is_transient(e):
+                    break
+                if attempt <= self.retries:
+                    app.logger.warning(f"\t{key}: {type(e).__name__} on attempt {attempt}, retrying in {delay}s")
+                    sleep(delay)
+                    delay *= 2
+        result.elapsed = monotonic() - start
+        return result
+
+    def run(self, tasks: Iterable[Tuple[Hashable, Hashable, Callable[[], Any]]]) -> List[TaskResult]:
+        """
+        Runs the tasks and returns their results in submission order.
+
+        :param tasks: iterable of (key, group, callable) tuples. Keys must be unique.
+        :returns: one TaskResult per task. Failed or timed out tasks carry the exception in `error`.
+        """
+        tasks = list(tasks)
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {executor.submit(self._run, key, group, func): key for key, group, func in tasks}
+        timed_out = False
+        try:
+            for future in as_completed(futures, timeout=self.timeout):
+                results[futures[future]] = future.result()
+        except FuturesTimeoutError as e:
+            timed_out = True
+            for key in futures.values():
+                results.setdefault(key, TaskResult(key, error=e, elapsed=self.timeout))
+        finally:
+            executor.shutdown(wait=not timed_out, cancel_futures=True)
+        return [results[key] for key, _, _ in tasks]
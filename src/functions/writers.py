@@ -0,0 +1,66 @@
+from typing import Callable, Dict
+import pandas as pd
+import os
+
+WRITERS: Dict[str, Callable[[pd.DataFrame, str], None]] = {}
+
+def register_writer(*extensions: str):
+    """
+    Registers a DataFrame writer for the given file extensions.
+
+    :param extensions: Extensions handled by the writer, e.g. ".csv".
+    """
+    def decorator(func: Callable[[pd.DataFrame, str], None]):
+        for extension in extensions:
+            WRITERS[extension.lower()] = func
+        return func
+    return decorator
+
+def write_dataframe(df: pd.DataFrame, output_path: str):
+    """
+    Writes a DataFrame with the fast path registered for the output extension.
+
+    :param df: DataFrame to be written.
+    :param output_path: Destination file. Its extension selects the writer.
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"No writer registered for '{extension}' files. Available: {', '.join(sorted(WRITERS))}")
+
+    dirname = os.path.dirname(output_path)
+    if dirname != "":
+        os.makedirs(dirname, exist_ok=True)
+    WRITERS[extension](df, output_path)
+
+@register_writer(".csv")
+def write_csv(df: pd.DataFrame, output_path: str):
+    # pandas writes the frame in row chunks, without building Python objects per row
+    df.to_csv(output_path, index=False, chunksize=100_000)
+
+@register_writer(".xlsx")
+def write_xlsx(df: pd.DataFrame, output_path: str):
+    # write-only workbooks stream rows to disk in constant memory
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([str(column) for column in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        sheet.append(row)
+    workbook.save(output_path)
+
+@register_writer(".parquet")
+def write_parquet(df: pd.DataFrame, output_path: str):
+    df.to_parquet(output_path, index=False)
+
+@register_writer(".feather")
+def write_feather(df: pd.DataFrame, output_path: str):
+    df.reset_index(drop=True).to_feather(output_path)
+
+@register_writer(".xls")
+def write_pyexcel(df: pd.DataFrame, output_path: str):
+    # legacy formats go through pyexcel, fed with rows instead of one dict per record
+    import pyexcel
+
+    array = [[str(column) for column in df.columns], *df.itertuples(index=False, name=None)]
+    pyexcel.save_as(array=array, dest_file_name=output_path)
@@ -1,78 +1,108 @@
 import os; os.chdir(source_dir := os.path.dirname(os.path.abspath(__file__)))
 
-from data_access.sqlite_estados import SQLiteEstados
-from functions.extraction import *
-from functions.file_saving import *
+from functions.metrics import PROFILE_MODES, configure_metrics
 from time import time
 
 import argparse
 import app
-import pandas as pd
 
-def main(populate: bool, read_and_process: bool):
+def main(populate: bool, read_and_process: bool, refresh_input_cache: bool = False, profile: str = None):
     app.logger.info("Starting Automation")
     start_time = time()
+    metrics = configure_metrics(app.config.get("metrics_file"), profile=profile)
     
     if not any([populate, read_and_process]):
         app.logger.info("Nothing to do.")
         return
     
+    db_path = os.path.join(".", "data_source", "estados_brasil.db")
+    
     if populate:
+        # imported here so report-only runs do not load the extraction stack (requests, selenium, openpyxl, pydantic)
+        from data_access.sqlite_estados import SQLiteEstados
+        from functions.extraction import get_web_dataframe, iter_file_dataframes
+        from functions.merging import HashJoin
+        from models.model_estado import validate_estados
+        
         app.logger.info("")
         app.logger.info("POPULATING/UPDATING TABLE\n")
         
         app.logger.info("Getting data from web")
-        df_web  = get_web_dataframe()
-        
-        app.logger.info("Getting data from file")
-        df_file = get_file_dataframe()
-
-        app.logger.info("Merging both")
-        df_inner = pd.merge(df_web, df_file, on="capital", how="inner") 
-        app.logger.info("")
+        with metrics.stage("web_fetch") as stage:
+            df_web = get_web_dataframe()
+            stage.rows = len(df_web)
         
-        app.logger.info("Uploading dataframe")
-        db_path = os.path.join(".", "data_source", "estados_brasil.db")
+        app.logger.info("Getting data from file, merging and uploading by chunks")
+        # capitals are matched on normalized keys (accents, whitespace, case) and misses are logged
+        join = HashJoin(df_web, on="capital", name="web")
+        with SQLiteEstados(db_path, **app.config.get("sqlite", {})) as table_estados:
+            for df_file in metrics.iterate("file_read", iter_file_dataframes(refresh_cache=refresh_input_cache)):
+                with metrics.stage("merge") as stage:
+                    df_inner = join.probe(df_file, name="file")
+                    stage.rows = len(df_inner)
+                app.logger.info(f"\tChunk: {len(df_file)} file rows, {len(df_inner)} merged")
+                with metrics.stage("validation", rows=len(df_inner)):
+                    df_inner = validate_estados(df_inner)
+                with metrics.stage("upsert", rows=len(df_inner)):
+                    table_estados.upsert_df(df_inner, validate=False)
+            join.log_unmatched(name="file")
         app.logger.info("")
-        
-        with SQLiteEstados(db_path) as table_estados:
-            table_estados.upsert_df(df_inner)
             
     if read_and_process:
+        from data_access.sqlite_estados import SQLiteEstados
+        from functions.file_saving import most_populated_state_transform, regions_and_capitals_from_aggregates_transform, top_3_populated_regions_from_aggregates_transform
+        from functions.manifest import ReportManifest
+        from functions.reporting import ReportEngine
+        
         app.logger.info("")
         app.logger.info("PROCESSING ITEMS\n")
         
-        with SQLiteEstados(db_path) as table_estados:
-            df = table_estados.read_all()
-        
-        app.logger.info("--------------------------------------------")
-        app.logger.info("Generating top three populated regions")
-        generate_report(
-            df,
-            transform=most_populated_state_transform,
-            output_path=os.path.join("..", "output", "estados_mais_populosos.xls")
-        )
-        
-        app.logger.info("--------------------------------------------")
-        app.logger.info("Generate regions n captals")
-        generate_report(
-            df,
-            transform=regions_and_capitals_transform,
-            output_path=os.path.join("..", "output", "regioes_n_capitais.xls")
-        )
-        
-        app.logger.info("--------------------------------------------")
-        app.logger.info("generate_most_populated_state")
-        generate_report(
-            df,
-            transform=top_3_populated_regions_transform,
-            output_path=os.path.join("..", "output", "top3_regioes_populosas.csv")
-        )
+        with SQLiteEstados(db_path, **app.config.get("sqlite", {})) as table_estados:
+            # the table is streamed in chunks, so memory stays bounded whatever its size
+            df = table_estados.read_chunks(
+                columns=["estado", "capital", "regiao", "populacao"],
+                chunksize=app.config.get("read_chunksize", 50_000),
+            )
+            
+            app.logger.info("--------------------------------------------")
+            app.logger.info("Generating reports")
+            manifest = ReportManifest(os.path.join("..", "output", ".manifest.json"))
+            engine = ReportEngine(max_workers=app.config.get("report_workers", 4), manifest=manifest)
+            engine.register(
+                "estados_mais_populosos",
+                transform=most_populated_state_transform,
+                output_path=os.path.join("..", "output", "estados_mais_populosos.xls"),
+                source="estados"
+            )
+            # regional reports read the per-region aggregates kept up to date by the table triggers
+            engine.register(
+                "regioes_n_capitais",
+                transform=regions_and_capitals_from_aggregates_transform,
+                output_path=os.path.join("..", "output", "regioes_n_capitais.xls"),
+                source="region_aggregates"
+            )
+            engine.register(
+                "top3_regioes_populosas",
+                transform=top_3_populated_regions_from_aggregates_transform,
+                output_path=os.path.join("..", "output", "top3_regioes_populosas.csv"),
+                source="region_aggregates"
+            )
+            with metrics.stage("reports"):
+                results = engine.run(
+                    {"estados": df, "region_aggregates": table_estados.read_region_aggregates()},
+                    fingerprint=table_estados.fingerprint()
+                )
+            for result in results:
+                if not result.skipped:
+                    metrics.record(f"report:{result.job.name}", result.transform_s + result.write_s, rows=result.rows)
+            app.logger.info("")
  
     app.logger.info("")
     app.logger.info("===================================================")
     app.logger.info("RESUME")
     app.logger.info(f"\tExecution time: {round(time()-start_time, 1)}s")
+    metrics.log()
+    metrics.save()
     app.logger.info("===================================================")
 
 if __name__=="__main__":
@@ -80,9 +110,11 @@ if __name__=="__main__":
     parser = argparse.ArgumentParser(description="Capitals of Brazilian states")
     parser.add_argument("-P", "--populate", action="store_true", default=False, help="Insert new values ​​into the database")
     parser.add_argument("-R", "--read_and_process", action="store_true", default=False, help="Process items already existing in the database")
+    parser.add_argument("--refresh_input_cache", action="store_true", default=False, help="Parse the input file again instead of using its cached conversion")
+    parser.add_argument("--profile", nargs="?", const="cpu", choices=PROFILE_MODES, default=None, help="Write a cProfile (cpu, default) or tracemalloc (memory) dump per stage")
     args = parser.parse_args()
     
     app.redefine_config("app_config.yml")
-    app.redefine_logger(app.get_logger_filename(app.config.bot_id))
+    app.redefine_logger(app.get_logger_filename(app.config.bot_id), json_fields={"bot_id": app.config.bot_id}, **app.config.get("logging", {}))
     
-    main(args.populate, args.read_and_process)
\ No newline at end of file
+    main(args.populate, args.read_and_process, args.refresh_input_cache, args.profile)
\ No newline at end of file
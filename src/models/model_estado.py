@@ -1,4 +1,7 @@
 from pydantic import BaseModel, field_validator, ValidationError
+from typing import Dict, List
+import numpy as np
+import pandas as pd
 
 class Estado(BaseModel):
     estado: str
@@ -9,5 +12,83 @@ class Estado(BaseModel):
     @field_validator('populacao')
     def check_population(cls, value):
         if value <= 0:
-            raise ValidationError("A população deve ser maior que zero.")
-        return value
\ No newline at end of file
+            raise ValueError("A população deve ser maior que zero.")
+        return value
+
+class EstadoValidationError(ValueError):
+    """ Erro de validação de um DataFrame de estados, com os índices de todas as linhas inválidas """
+
+    def __init__(self, errors: Dict[str, List]):
+        self.errors = errors
+        self.rows = sorted({index for indexes in errors.values() for index in indexes})
+        details = "; ".join(f"{rule}: {indexes[:10]}{'...' if len(indexes) > 10 else ''}" for rule, indexes in errors.items())
+        super().__init__(f"{len(self.rows)} linha(s) inválida(s) - {details}")
+
+STR_FIELDS = [name for name, field in Estado.model_fields.items() if field.annotation is str]
+INT_FIELDS = [name for name, field in Estado.model_fields.items() if field.annotation is int]
+
+def _invalid_str(s: pd.Series) -> pd.Series:
+    missing = s.isna().to_numpy(dtype=bool)
+    if pd.api.types.infer_dtype(s, skipna=False) == "string":
+        # coluna string com pd.NA também é inferida como "string"
+        return pd.Series(missing, index=s.index)
+    not_str = ~s.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+    return pd.Series(missing | not_str, index=s.index)
+
+def _to_int(s: pd.Series):
+    """ Converte a coluna para inteiro, como o modo lax do pydantic (int, float sem fração ou texto numérico) """
+    if pd.api.types.is_integer_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        # inteiros anuláveis (Int64) com NA: as linhas ausentes são inválidas, não um erro do astype
+        invalid = pd.Series(s.isna().to_numpy(dtype=bool), index=s.index)
+        return s.where(~invalid, 0).astype(np.int64), invalid
+    numbers = pd.to_numeric(s.astype(str).str.strip() if s.dtype == object else s, errors="coerce")
+    numbers = numbers.astype(np.float64) if not pd.api.types.is_bool_dtype(s) else pd.Series(np.nan, index=s.index)
+    invalid = numbers.isna() | ~np.isfinite(numbers) | (numbers != np.floor(numbers))
+    return numbers.where(~invalid, 0).astype(np.int64), invalid
+
+def validate_estados(df: pd.DataFrame, strict: bool = False) -> pd.DataFrame:
+    """
+    Valida um DataFrame contra as regras do modelo Estado com operações vetorizadas por coluna.
+
+    :param df: DataFrame com as colunas estado, capital, regiao e populacao
+    :param strict: valida linha a linha com o modelo pydantic Estado (mais lento)
+    :returns: DataFrame apenas com as colunas do modelo, já tipadas
+    :raises EstadoValidationError: com os índices de todas as linhas inválidas
+    """
+    fields = list(Estado.model_fields)
+    missing = [name for name in fields if name not in df.columns]
+    if missing:
+        raise EstadoValidationError({f"coluna ausente: {name}": list(df.index) for name in missing})
+
+    if strict:
+        errors = {}
+        for index, record in zip(df.index, df[fields].to_dict(orient="records")):
+            try:
+                Estado(**record)
+            except ValidationError as e:
+                for error in e.errors():
+                    errors.setdefault(f"{error['loc'][0]}: {error['msg']}", []).append(index)
+        if errors:
+            raise EstadoValidationError(errors)
+
+    errors = {}
+    result = pd.DataFrame(index=df.index)
+    for name in STR_FIELDS:
+        invalid = _invalid_str(df[name])
+        if invalid.any():
+            errors[f"{name}: texto obrigatório"] = list(df.index[invalid.to_numpy()])
+        result[name] = df[name]
+
+    for name in INT_FIELDS:
+        values, invalid = _to_int(df[name])
+        if invalid.any():
+            errors[f"{name}: inteiro obrigatório"] = list(df.index[invalid.to_numpy()])
+        result[name] = values
+
+    not_positive = (result["populacao"] <= 0) & ~df.index.isin(errors.get("populacao: inteiro obrigatório", []))
+    if not_positive.any():
+        errors["populacao: deve ser maior que zero"] = list(df.index[not_positive.to_numpy()])
+
+    if errors:
+        raise EstadoValidationError(errors)
+    return result
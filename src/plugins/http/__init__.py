@@ -0,0 +1,4 @@
+from .session import HttpSession
+from .table import HtmlTableParser, parse_table
+from .cache import HttpCache, CachedPage
+from .links import NextLinkParser, find_next_link
@@ -0,0 +1,237 @@
+import os
+import json
+import pickle
+import hashlib
+import threading
+
+from time import time
+from urllib.parse import urlparse
+
+from .session import HttpSession
+
+class CachedPage():
+    def __init__(self, url:str, text:str, changed:bool, status:str):
+        """
+            Resultado de HttpCache.fetch.
+
+            ### Params
+            * url : URL consultada
+            * text : conteúdo da página
+            * changed : indica se o conteúdo mudou desde a última versão em cache
+            * status : "fresh" (dentro do TTL), "revalidated" (304), "modified" (200) ou "uncached"
+        """
+        self.url = url
+        self.text = text
+        self.changed = changed
+        self.status = status
+
+class HttpCache():
+    INDEX_FILENAME = 'index.json'
+
+    def __init__(self, directory:str=os.path.join('.', '__cache__', 'http'), ttl:int=3600, max_bytes:int=100 * 1024 * 1024):
+        """
+            # HttpCache
+            Cache em disco de páginas HTTP, indexado pela URL.
+
+            Dentro do TTL a página é servida do disco sem acesso à rede. Após o TTL, é feita uma
+            requisição condicional (If-None-Match / If-Modified-Since); se o servidor responder 304
+            a cópia em disco é reaproveitada. Também guarda snapshots (pickle) de objetos derivados
+            da página, como o DataFrame já tratado, válidos enquanto a página não mudar.
+            O tamanho total é limitado por `max_bytes`, descartando as entradas menos usadas (LRU).
+
+            ### Params
+            * directory : pasta onde o cache é armazenado
+            * ttl : tempo (em segundos) em que a página é considerada fresca sem revalidação
+            * max_bytes : tamanho máximo do cache em disco
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = self._load_index()
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, self.INDEX_FILENAME)
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path())
+
+    @staticmethod
+    def _key(url:str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key:str, suffix:str) -> str:
+        return os.path.join(self.directory, f'{key}{suffix}')
+
+    def _files(self, key:str, entry:dict) -> list:
+        return [self._path(key, '.body')] + [self._path(key, f'.{variant}.pkl') for variant in entry.get('snapshots', [])]
+
+    def _remove(self, key:str):
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        for path in self._files(key, entry):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _drop_snapshots(self, key:str, entry:dict):
+        for variant in entry.get('snapshots', []):
+            try:
+                os.remove(self._path(key, f'.{variant}.pkl'))
+            except FileNotFoundError:
+                pass
+        entry['snapshots'] = []
+        entry['size'] = entry.get('body_size', 0)
+
+    def _evict(self):
+        total = sum(entry.get('size', 0) for entry in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1].get('last_access', 0)):
+            if total <= self.max_bytes:
+                break
+            total -= entry.get('size', 0)
+            self._remove(key)
+
+    def fetch(self, session:HttpSession, url:str, **kwargs) -> CachedPage:
+        """
+            Retorna a página, usando a cópia em disco quando ainda fresca ou quando o servidor
+            confirmar (304) que ela não mudou.
+
+            ### params
+            * session : HttpSession usada para as requisições
+            * url : URL da página
+            * kwargs : parâmetros repassados ao HttpSession.get
+
+            ### return
+            * CachedPage
+        """
+        if urlparse(url).scheme not in ('http', 'https'):
+            return CachedPage(url, session.get_text(url, **kwargs), changed=True, status='uncached')
+
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and not os.path.isfile(self._path(key, '.body')):
+                self._remove(key)
+                entry = None
+
+            now = time()
+            if entry is not None and now - entry['fetched_at'] < self.ttl:
+                entry['last_access'] = now
+                self._save_index()
+                return CachedPage(url, self._read_body(key), changed=False, status='fresh')
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, headers=headers, **kwargs)
+
+        with self._lock:
+            now = time()
+            if response.status_code == 304 and entry is not None:
+                entry['fetched_at'] = now
+                entry['last_access'] = now
+                self._save_index()
+                return CachedPage(url, self._read_body(key), changed=False, status='revalidated')
+
+            text = session.response_text(response)
+            body = text.encode('utf-8')
+            with open(self._path(key, '.body'), 'wb') as f:
+                f.write(body)
+
+            entry = self._index.setdefault(key, {'url': url, 'snapshots': []})
+            self._drop_snapshots(key, entry)
+            entry.update({
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': now,
+                'last_access': now,
+                'body_size': len(body),
+                'size': len(body),
+            })
+            self._evict()
+            self._save_index()
+            return CachedPage(url, text, changed=True, status='modified')
+
+    def _read_body(self, key:str) -> str:
+        with open(self._path(key, '.body'), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def load_snapshot(self, url:str, variant:str='default'):
+        """
+            Retorna o objeto salvo para a versão atual da página, ou None se não houver.
+
+            ### params
+            * url : URL da página de origem
+            * variant : identificador do tratamento aplicado (ex.: hash dos parâmetros de extração)
+        """
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or variant not in entry.get('snapshots', []):
+                return None
+            try:
+                with open(self._path(key, f'.{variant}.pkl'), 'rb') as f:
+                    return pickle.load(f)
+            except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+                # snapshot ausente ou corrompido: removido também do índice em disco
+                try:
+                    os.remove(self._path(key, f'.{variant}.pkl'))
+                except FileNotFoundError:
+                    pass
+                entry['snapshots'].remove(variant)
+                entry['size'] = entry.get('body_size', 0) + sum(
+                    os.path.getsize(self._path(key, f'.{v}.pkl')) for v in entry['snapshots']
+                )
+                self._save_index()
+                return None
+
+    def save_snapshot(self, url:str, obj, variant:str='default'):
+        """
+            Salva um objeto derivado da versão atual da página. É descartado quando a página mudar.
+
+            ### params
+            * url : URL da página de origem
+            * obj : objeto a ser salvo (ex.: DataFrame tratado)
+            * variant : identificador do tratamento aplicado
+        """
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return
+            path = self._path(key, f'.{variant}.pkl')
+            with open(path, 'wb') as f:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if variant not in entry['snapshots']:
+                entry['snapshots'].append(variant)
+            entry['size'] = entry.get('body_size', 0) + sum(
+                os.path.getsize(self._path(key, f'.{v}.pkl')) for v in entry['snapshots']
+            )
+            self._evict()
+            self._save_index()
+
+    def clear(self):
+        """
+            Remove todas as entradas do cache.
+        """
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
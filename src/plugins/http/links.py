@@ -0,0 +1,57 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+class NextLinkParser(HTMLParser):
+    def __init__(self, text:str=None):
+        """
+            # NextLinkParser
+            Localiza o link para a próxima página de uma listagem paginada: <link rel="next">,
+            <a rel="next"> ou, se `text` for informado, o primeiro <a> cujo texto o contenha.
+
+            ### Params
+            * text : texto do link de próxima página, ex.: "Próxima" (comparação sem maiúsculas/minúsculas)
+        """
+        super().__init__(convert_charrefs=True)
+        self.text = text.casefold() if text else None
+        self.href = None
+
+        self._anchor_href = None
+        self._anchor_text = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.href is not None or tag not in ("a", "link"):
+            return
+        attrs = dict(attrs)
+        if "next" in (attrs.get("rel") or "").lower().split() and attrs.get("href"):
+            self.href = attrs["href"]
+        elif tag == "a" and self.text is not None:
+            self._anchor_href = attrs.get("href")
+            self._anchor_text = []
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._anchor_text is not None:
+            text = " ".join("".join(self._anchor_text).split()).casefold()
+            if self.href is None and self._anchor_href and self.text in text:
+                self.href = self._anchor_href
+            self._anchor_href = self._anchor_text = None
+
+    def handle_data(self, data):
+        if self._anchor_text is not None:
+            self._anchor_text.append(data)
+
+def find_next_link(html:str, base_url:str, text:str=None) -> str:
+    """
+        Retorna a URL absoluta da próxima página, ou None se não houver.
+
+        ### params
+        * html : conteúdo da página atual
+        * base_url : URL da página atual, usada para resolver links relativos
+        * text : texto do link de próxima página, quando a página não usa rel="next"
+    """
+    parser = NextLinkParser(text=text)
+    parser.feed(html)
+    parser.close()
+
+    if parser.href is None or parser.href.startswith(("#", "javascript:")):
+        return None
+    return urljoin(base_url, parser.href)
@@ -0,0 +1,108 @@
+import os
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+from urllib3.util.retry import Retry
+
+class HttpSession():
+    def __init__(self, timeout:int=30, pool_connections:int=10, pool_maxsize:int=10, retries:int=3, backoff_factor:float=0.5, user_agent:str=None):
+        """
+            # HttpSession
+            Sessão HTTP reutilizável, com pool de conexões e retentativas, para páginas que não precisam de um navegador.
+
+            ### Params
+            * timeout : timeout (em segundos) de cada requisição
+            * pool_connections : quantidade de hosts mantidos no pool
+            * pool_maxsize : quantidade máxima de conexões abertas por host
+            * retries : quantidade de retentativas em erros de conexão e status 429/5xx
+            * backoff_factor : fator do backoff exponencial entre retentativas
+            * user_agent : user-agent enviado nas requisições
+        """
+        self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.user_agent = user_agent or "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
+        self._session = None
+
+    def start(self):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, max_retries=retry)
+
+        self._session = requests.Session()
+        self._session.headers.update({"User-Agent": self.user_agent})
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def get_session(self) -> requests.Session:
+        """
+            Retorna a sessão requests em uso.
+        """
+        return self._session
+
+    def get(self, url:str, **kwargs) -> requests.Response:
+        """
+            Executa um GET na url informada, validando o status da resposta.
+
+            ### params
+            * url : URL que se deseja acessar.
+            * kwargs : parâmetros repassados ao requests.Session.get
+
+            ### return
+            * objeto requests.Response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        response = self._session.get(url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def get_text(self, url:str, **kwargs) -> str:
+        """
+            Retorna o conteúdo textual da url. URLs "file://" e caminhos locais são lidos do disco,
+            o que permite usar fixtures HTML sem servidor.
+
+            ### params
+            * url : URL ou caminho do arquivo que se deseja ler.
+
+            ### return
+            * conteúdo da página decodificado
+        """
+        parsed = urlparse(url)
+        if parsed.scheme in ("", "file"):
+            path = url2pathname(parsed.path) if parsed.scheme == "file" else url
+            with open(os.path.abspath(path), encoding=kwargs.pop("encoding", "utf-8")) as f:
+                return f.read()
+
+        return self.response_text(self.get(url, **kwargs))
+
+    @staticmethod
+    def response_text(response:requests.Response) -> str:
+        """
+            Decodifica o conteúdo da resposta, detectando a codificação quando o servidor não a informa.
+        """
+        if response.encoding is None or response.encoding.lower() == "iso-8859-1":
+            response.encoding = response.apparent_encoding
+        return response.text
+
+    def close(self):
+        """
+            Encerra as conexões do pool.
+        """
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
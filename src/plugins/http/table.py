@@ -0,0 +1,120 @@
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+
+class HtmlTableParser(HTMLParser):
+    def __init__(self, attrs:Dict[str, str]=None, index:int=0):
+        """
+            # HtmlTableParser
+            Extrai cabeçalhos e células de uma tabela HTML em uma única passada, sem navegador.
+
+            ### Params
+            * attrs : atributos que identificam a tabela, ex.: {"bgcolor": "#ffffff"}
+            * index : qual das tabelas encontradas deve ser extraída (0 = primeira)
+        """
+        super().__init__(convert_charrefs=True)
+        self.attrs = {k.lower(): v.lower() for k, v in (attrs or {}).items()}
+        self.index = index
+
+        self.columns: List[str] = []
+        self.rows: List[List[str]] = []
+        self.found = False
+
+        self._matches = 0
+        self._depth = 0
+        self._row = None
+        self._cell = None
+        self._cell_is_header = False
+
+    def _match(self, attrs) -> bool:
+        attrs = {k.lower(): (v or "").lower() for k, v in attrs}
+        return all(attrs.get(k) == v for k, v in self.attrs.items())
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self._depth:
+                self._depth += 1
+            elif not self.found and self._match(attrs):
+                if self._matches == self.index:
+                    self._depth = 1
+                    self.found = True
+                self._matches += 1
+            return
+
+        if self._depth != 1:
+            return
+
+        # </td>, </th> e </tr> são opcionais no HTML: uma nova célula ou linha fecha a anterior
+        if tag == "tr":
+            self._close_row()
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            self._close_cell()
+            self._cell = []
+            self._cell_is_header = tag == "th"
+        elif tag == "br" and self._cell is not None:
+            self._cell.append("\n")
+
+    def _close_cell(self):
+        if self._cell is None:
+            return
+        self._row.append((self._cell_is_header, " ".join("".join(self._cell).split())))
+        self._cell = None
+
+    def _close_row(self):
+        self._close_cell()
+        if self._row:
+            cells = [text for _, text in self._row]
+            if not all(is_header for is_header, _ in self._row):
+                # linha com <td>: dados, incluindo um eventual <th> de cabeçalho de linha
+                self.rows.append(cells)
+            elif not self.columns:
+                # linha só com <th>: cabeçalho (repetições do cabeçalho no meio da tabela são ignoradas)
+                self.columns = cells
+        self._row = None
+
+    def handle_endtag(self, tag):
+        if tag == "table" and self._depth:
+            if self._depth == 1:
+                self._close_row()
+            self._depth -= 1
+            return
+
+        if self._depth != 1:
+            return
+
+        if tag in ("td", "th"):
+            self._close_cell()
+        elif tag == "tr":
+            self._close_row()
+
+    def handle_data(self, data):
+        # o texto de tabelas aninhadas (depth > 1) não entra na célula que as contém
+        if self._depth == 1 and self._cell is not None:
+            self._cell.append(data)
+
+def parse_table(html:str, attrs:Dict[str, str]=None, index:int=0) -> Tuple[List[str], List[List[str]]]:
+    """
+        Extrai a tabela indicada de um documento HTML.
+
+        ### params
+        * html : conteúdo do documento
+        * attrs : atributos que identificam a tabela, ex.: {"bgcolor": "#ffffff"}
+        * index : qual das tabelas encontradas deve ser extraída (0 = primeira)
+
+        ### return
+        * tupla (colunas, linhas), pronta para pd.DataFrame(linhas, columns=colunas)
+    """
+    parser = HtmlTableParser(attrs=attrs, index=index)
+    parser.feed(html)
+    parser.close()
+    parser._close_row()
+
+    if not parser.found:
+        raise LookupError(f"Tabela com atributos {attrs} não encontrada.")
+    columns, rows = parser.columns, parser.rows
+    if not columns and rows:
+        # cabeçalho escrito com <td> (ex.: <td><b>Estado</b></td>): a primeira linha é o cabeçalho
+        columns, rows = rows[0], rows[1:]
+    if not columns or not rows:
+        raise LookupError(f"Tabela com atributos {attrs} sem cabeçalho ou sem linhas.")
+    return columns, rows
@@ -1,2 +1,7 @@
 from .selenium import Selenium
-from .frame import Frame
\ No newline at end of file
+from .frame import Frame
+from .pool import SeleniumPool
+from .driver_cache import get_driver_path
+from .profiles import PROFILES, get_profile
+from .waits import WaitEngine, WaitStats
+from .network import NetworkLog, NetworkResponse
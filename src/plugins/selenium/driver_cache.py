@@ -0,0 +1,51 @@
+import os
+import json
+import threading
+
+from time import time
+from webdriver_manager.chrome import ChromeDriverManager
+
+DEFAULT_CACHE_FILE = os.path.join('.', '__cache__', 'chromedriver.json')
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+
+_lock = threading.Lock()
+
+def get_driver_path(cache_file:str=DEFAULT_CACHE_FILE, max_age:int=DEFAULT_MAX_AGE, refresh:bool=False) -> str:
+    """
+        Retorna o caminho do chromedriver, consultando o ChromeDriverManager apenas quando
+        o caminho salvo em disco não existe, expirou ou aponta para um arquivo removido.
+
+        ### params
+        * cache_file : arquivo JSON onde o caminho resolvido é armazenado
+        * max_age : idade máxima (em segundos) do cache, para acompanhar atualizações do Chrome
+        * refresh : força nova resolução pelo ChromeDriverManager
+
+        ### return
+        * caminho absoluto do executável do chromedriver
+    """
+    with _lock:
+        cached_path = None
+        try:
+            with open(cache_file, encoding='utf-8') as f:
+                cached = json.load(f)
+            if os.path.isfile(cached['path']):
+                cached_path = cached['path']
+                if not refresh and time() - cached['resolved_at'] <= max_age:
+                    return cached_path
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass
+
+        try:
+            path = ChromeDriverManager().install().replace("THIRD_PARTY_NOTICES.", "")
+        except Exception:
+            # sem acesso à internet, um driver já resolvido (mesmo expirado) é melhor que nenhum
+            if cached_path is None:
+                raise
+            return cached_path
+
+        dirname = os.path.dirname(cache_file)
+        if dirname != '':
+            os.makedirs(dirname, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'path': path, 'resolved_at': time()}, f)
+        return path
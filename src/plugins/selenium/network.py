@@ -0,0 +1,89 @@
+import re
+import json
+import base64
+import threading
+
+from typing import Dict, List, Pattern, Union
+
+class NetworkResponse():
+    def __init__(self, request_id:str, url:str, status:int, mime_type:str, resource_type:str, body:bytes=None):
+        """
+            # NetworkResponse
+            Resposta de rede observada no log de performance do Chrome, com o corpo obtido via CDP.
+        """
+        self.request_id = request_id
+        self.url = url
+        self.status = status
+        self.mime_type = mime_type
+        self.resource_type = resource_type
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        return None if self.body is None else self.body.decode("utf-8", errors="replace")
+
+    def json(self):
+        """
+            Retorna o corpo interpretado como JSON.
+        """
+        return json.loads(self.body)
+
+    def __repr__(self):
+        return f"NetworkResponse({self.status} {self.resource_type} {self.url!r})"
+
+class NetworkLog():
+    def __init__(self):
+        """
+            # NetworkLog
+            Acompanha as mensagens CDP Network.* do log de performance (driver.get_log("performance")),
+            que é esvaziado a cada leitura, guardando as respostas recebidas e quais já terminaram de carregar.
+        """
+        self._lock = threading.Lock()
+        self._responses: Dict[str, NetworkResponse] = {}
+        self._finished = set()
+
+    def feed(self, entries:List[dict]):
+        """
+            Processa entradas do log de performance.
+        """
+        with self._lock:
+            for entry in entries:
+                message = json.loads(entry["message"])["message"]
+                method, params = message.get("method"), message.get("params", {})
+                if method == "Network.responseReceived":
+                    response = params["response"]
+                    self._responses[params["requestId"]] = NetworkResponse(
+                        params["requestId"], response.get("url"), response.get("status"),
+                        response.get("mimeType"), params.get("type"),
+                    )
+                elif method == "Network.loadingFinished":
+                    self._finished.add(params["requestId"])
+                elif method == "Network.loadingFailed":
+                    self._responses.pop(params["requestId"], None)
+
+    def match(self, url_pattern:Union[str, Pattern], resource_types:List[str]=None) -> List[NetworkResponse]:
+        """
+            Retorna as respostas já carregadas cuja URL case com `url_pattern` (expressão regular),
+            na ordem em que foram recebidas.
+        """
+        pattern = re.compile(url_pattern) if isinstance(url_pattern, str) else url_pattern
+        with self._lock:
+            return [
+                response for request_id, response in self._responses.items()
+                if request_id in self._finished
+                and pattern.search(response.url or "")
+                and (resource_types is None or response.resource_type in resource_types)
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+            self._finished.clear()
+
+def decode_body(result:dict) -> bytes:
+    """
+        Converte o retorno de Network.getResponseBody em bytes.
+    """
+    if result.get("base64Encoded"):
+        return base64.b64decode(result["body"])
+    return result["body"].encode("utf-8")
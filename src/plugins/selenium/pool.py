@@ -0,0 +1,127 @@
+import threading
+
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from typing import Callable
+
+from .selenium import Selenium
+from .driver_cache import get_driver_path
+
+class SeleniumPool():
+    def __init__(self, size:int=2, factory:Callable[..., Selenium]=None, acquire_timeout:int=None, **selenium_kwargs):
+        """
+            # SeleniumPool
+            Mantém até `size` sessões Selenium aquecidas (headless por padrão) e as reutiliza
+            entre raspagens, evitando o cold-start do navegador a cada uso.
+
+            As sessões são iniciadas sob demanda e, ao serem devolvidas, têm cookies, storage
+            e abas extras limpos. Sessões que falharem na limpeza são descartadas.
+
+            ### Params
+            * size : quantidade máxima de sessões abertas simultaneamente
+            * factory : função que cria uma instância Selenium (por padrão, Selenium(**selenium_kwargs))
+            * acquire_timeout : tempo máximo (em segundos) de espera por uma sessão livre (None = sem limite)
+            * selenium_kwargs : parâmetros repassados ao construtor do Selenium
+        """
+        if "profile" not in selenium_kwargs:
+            selenium_kwargs.setdefault("headless", True)
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.selenium_kwargs = selenium_kwargs
+        self._factory = factory or self._default_factory
+
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _default_factory(self) -> Selenium:
+        self.selenium_kwargs.setdefault("driver_path", get_driver_path())
+        return Selenium(**self.selenium_kwargs)
+
+    def _create(self) -> Selenium:
+        webdriver = self._factory()
+        webdriver.start()
+        with self._lock:
+            self._sessions.append(webdriver)
+        return webdriver
+
+    def _discard(self, webdriver:Selenium):
+        with self._lock:
+            if webdriver in self._sessions:
+                self._sessions.remove(webdriver)
+        webdriver.quit()
+
+    def acquire(self) -> Selenium:
+        """
+            Retorna uma sessão livre, iniciando uma nova se o pool ainda não estiver cheio.
+        """
+        if self._closed:
+            raise RuntimeError("SeleniumPool já foi encerrado.")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f"Nenhuma sessão Selenium livre após {self.acquire_timeout}s.")
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        try:
+            return self._create()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, webdriver:Selenium):
+        """
+            Devolve a sessão ao pool, limpando seu estado.
+        """
+        try:
+            if self._closed:
+                self._discard(webdriver)
+                return
+            try:
+                webdriver.reset_session()
+                self._idle.put(webdriver)
+            except Exception:
+                self._discard(webdriver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self):
+        """
+            Context manager que empresta uma sessão do pool.
+
+            ### Exemplo
+            >>> with pool.session() as webdriver:
+            ...     webdriver.go_to_url(url)
+        """
+        webdriver = self.acquire()
+        try:
+            yield webdriver
+        finally:
+            self.release(webdriver)
+
+    def warm_up(self, n:int=None):
+        """
+            Inicia antecipadamente `n` sessões (por padrão, o tamanho do pool).
+        """
+        webdrivers = [self.acquire() for _ in range(min(n or self.size, self.size))]
+        for webdriver in webdrivers:
+            self.release(webdriver)
+
+    def close(self):
+        """
+            Encerra todas as sessões do pool.
+        """
+        self._closed = True
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for webdriver in sessions:
+            webdriver.quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
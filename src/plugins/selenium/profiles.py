@@ -0,0 +1,43 @@
+# Padrões de URL (Network.setBlockedURLs aceita '*' como curinga) bloqueados pelo perfil "scrape"
+IMAGE_URLS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp", "*.avif"]
+MEDIA_URLS = ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m4a", "*.avi", "*.mov"]
+FONT_URLS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+# hosts de terceiros (anúncios, analytics, widgets sociais) que não fazem parte do conteúdo raspado
+THIRD_PARTY_URLS = [
+    "*doubleclick.net*", "*googlesyndication.com*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*googletagservices.com*", "*googleadservices.com*", "*adservice.google.*", "*facebook.net*",
+    "*facebook.com/plugins*", "*connect.facebook.net*", "*platform.twitter.com*", "*addthis.com*",
+    "*sharethis.com*", "*disqus.com*", "*hotjar.com*", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*apis.google.com*", "*blogger.com/static/v1/widgets*", "*youtube.com/embed*",
+]
+
+PROFILES = {
+    # comportamento original: navegador visível e maximizado, carregamento completo e log de performance
+    "default": {
+        "headless": False,
+        "start_maximized": True,
+        "page_load_strategy": "normal",
+        "performance_log": True,
+        "block_images": False,
+        "blocked_urls": [],
+    },
+    # raspagem: sem interface, pronto no DOMContentLoaded e sem baixar o que não é conteúdo
+    "scrape": {
+        "headless": True,
+        "start_maximized": False,
+        "page_load_strategy": "eager",
+        "performance_log": False,
+        "block_images": True,
+        "blocked_urls": IMAGE_URLS + MEDIA_URLS + FONT_URLS + THIRD_PARTY_URLS,
+    },
+}
+
+def get_profile(name:str) -> dict:
+    """
+        Retorna uma cópia do perfil de inicialização `name`.
+    """
+    if name not in PROFILES:
+        raise ValueError(f"Perfil Selenium desconhecido: '{name}'. Disponíveis: {', '.join(PROFILES)}")
+    profile = dict(PROFILES[name])
+    profile["blocked_urls"] = list(profile["blocked_urls"])
+    return profile
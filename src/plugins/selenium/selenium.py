@@ -1,22 +1,25 @@
 import os
+import re
 
+from typing import List, Pattern, Union
+from urllib.parse import urlparse
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import Select
 
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.alert import Alert 
 
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service 
-from time import sleep
-from retry import retry
+from .driver_cache import get_driver_path
+from .profiles import get_profile
+from .waits import WaitEngine, WaitStats
+from .network import NetworkLog, NetworkResponse, decode_body
 
 class Selenium():
-    def __init__(self, capsolver_api_token:str=None, relative_download_path:str=None, environment:str="DEV", timeout:int=30, options:Options=None, disable_extensions=False, undetected_chromedriver=False):
+    def __init__(self, capsolver_api_token:str=None, relative_download_path:str=None, environment:str="DEV", timeout:int=30, options:Options=None, disable_extensions=False, undetected_chromedriver=False, driver_path:str=None, headless:bool=None, profile:str="default", performance_log:bool=None, blocked_urls:list=None, poll_frequency:float=0.05):
         """
             O self._driver procura o webdriver mais atualizado para acompanhar as atualizações do Google Chrome. 
 
@@ -25,6 +28,14 @@ class Selenium():
             ### Params
             * homolog : ambiente de produção ou desenolvimento  
             * timeout : seta o timeout do wait
+            * driver_path : caminho do chromedriver (por padrão, resolvido e cacheado em disco por get_driver_path)
+            * headless : inicia o navegador sem interface gráfica (por padrão, conforme o perfil)
+            * profile : perfil de inicialização (ver profiles.PROFILES): "default" mantém o navegador visível,
+              maximizado e com log de performance; "scrape" é headless, usa pageLoadStrategy=eager e bloqueia
+              imagens, mídia, fontes e hosts de terceiros
+            * performance_log : ativa o log de performance (goog:loggingPrefs) independentemente do perfil
+            * blocked_urls : padrões de URL bloqueados via CDP, somados aos do perfil
+            * poll_frequency : intervalo (em segundos) entre verificações das esperas
         """
         
         self.options = options or Options()
@@ -34,11 +45,26 @@ class Selenium():
         self.timeout = timeout
         self.disable_extensions = disable_extensions
         self.undetected_chromedriver = undetected_chromedriver
+        self.driver_path = driver_path
+        self.profile = get_profile(profile)
+        self.headless = self.profile["headless"] if headless is None else headless
+        self.performance_log = self.profile["performance_log"] if performance_log is None else performance_log
+        self.blocked_urls = self.profile["blocked_urls"] + list(blocked_urls or [])
+        self.poll_frequency = poll_frequency
+        self.wait_stats = WaitStats()
+        self._visited_origins = set()
+        self.network_log = NetworkLog()
 
     def start(self):        
-        self.options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
-        DesiredCapabilities.CHROME['goog:loggingPrefs'] = {'performance': 'ALL'}
-        self.options.add_argument("--start-maximized")
+        if self.performance_log:
+            self.options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            DesiredCapabilities.CHROME['goog:loggingPrefs'] = {'performance': 'ALL'}
+        self.options.page_load_strategy = self.profile["page_load_strategy"]
+        if self.profile["start_maximized"]:
+            self.options.add_argument("--start-maximized")
+        if self.headless:
+            self.options.add_argument("--headless=new")
+            self.options.add_argument("--window-size=1920,1080")
         self.options.add_argument("--no-sandbox")
         self.options.accept_insecure_certs = True
         self.options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36")
@@ -57,10 +83,11 @@ class Selenium():
                     "name": "Chrome PDF Viewer"}],
                 "plugins.always_open_pdf_externally": True,
                 "profile.default_content_settings.popups": 0,
-                "logging": {
-                    "performance": "ALL"
-                },
             }
+        if self.performance_log:
+            prefs["logging"] = {"performance": "ALL"}
+        if self.profile["block_images"]:
+            prefs["profile.managed_default_content_settings.images"] = 2
         self.options.add_experimental_option("prefs", prefs)  
         self._download_path = os.path.abspath(os.path.join('.', self.relative_download_path or ""))
         prefs["download.default_directory"] = self._download_path
@@ -74,14 +101,27 @@ class Selenium():
             self.options.add_argument(path_capsolver_extension)
                 
         self._driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install().replace("THIRD_PARTY_NOTICES.", "")), 
+            service=Service(self.driver_path or get_driver_path()), 
             options=self.options)
         
+        if self.blocked_urls:
+            self.block_urls(self.blocked_urls)
+
         self._action = ActionChains(self._driver)
         self._alert = Alert(self._driver)
-        self._wait = WebDriverWait(self._driver, self.timeout)
-        self._long_wait = WebDriverWait(self._driver, self.timeout*3)
-        self._short_wait = WebDriverWait(self._driver, self.timeout/3)
+        self._wait = WaitEngine(self._driver, self.timeout, self.poll_frequency, self.wait_stats)
+        self._long_wait = WaitEngine(self._driver, self.timeout*3, self.poll_frequency, self.wait_stats)
+        self._short_wait = WaitEngine(self._driver, self.timeout/3, self.poll_frequency, self.wait_stats)
+
+    def block_urls(self, patterns:list):
+        """
+            Bloqueia, via CDP, as requisições cujas URLs casem com os padrões (curinga '*').
+
+            ### params
+            * patterns : padrões de URL, ex.: ["*.png", "*doubleclick.net*"]
+        """
+        self._driver.execute_cdp_cmd("Network.enable", {})
+        self._driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
 
     def get_driver(self):
         """
@@ -95,6 +135,66 @@ class Selenium():
         """
         return self._long_wait if long_wait else self._short_wait if short_wait else self._wait
     
+    def wait_page_ready(self, idle_ms:int=500, long_wait=False):
+        """
+            Aguarda o carregamento do documento e `idle_ms` milissegundos sem novas requisições.
+        """
+        return self.get_wait(long_wait=long_wait).network_idle(idle_ms)
+
+    def _read_network_log(self):
+        if not self.performance_log:
+            raise RuntimeError("Captura de respostas requer o log de performance: use performance_log=True (o perfil 'scrape' o desativa).")
+        self.network_log.feed(self._driver.get_log("performance"))
+
+    def clear_network_log(self):
+        """
+            Descarta as respostas observadas até agora (chamar antes de navegar para capturar
+            apenas as respostas da próxima página).
+        """
+        self._read_network_log()
+        self.network_log.clear()
+
+    def get_response_body(self, response:NetworkResponse) -> NetworkResponse:
+        """
+            Preenche `response.body` com o corpo da resposta, obtido via CDP Network.getResponseBody.
+        """
+        if response.body is None:
+            result = self._driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": response.request_id})
+            response.body = decode_body(result)
+        return response
+
+    def capture_responses(self, url_pattern:Union[str, Pattern], count:int=1, resource_types:List[str]=None, long_wait=False, short_wait=False) -> List[NetworkResponse]:
+        """
+            Aguarda, no log de rede (CDP) do navegador, respostas cujas URLs casem com `url_pattern`
+            e retorna seus corpos, sem depender da renderização nem de percorrer o DOM.
+
+            Requer performance_log=True.
+
+            ### params
+            * url_pattern : expressão regular buscada na URL das respostas
+            * count : quantidade mínima de respostas aguardadas
+            * resource_types : tipos de recurso aceitos (ex.: ["XHR", "Fetch", "Document"]); por padrão, todos
+
+            ### return
+            * lista de NetworkResponse, na ordem de chegada, com `body` preenchido (`.text`, `.json()`)
+        """
+        pattern = re.compile(url_pattern) if isinstance(url_pattern, str) else url_pattern
+
+        def matched(driver):
+            self._read_network_log()
+            responses = self.network_log.match(pattern, resource_types)
+            return responses if len(responses) >= count else None
+
+        wait = self.get_wait(long_wait=long_wait, short_wait=short_wait)
+        responses = wait.until(matched, f"Nenhuma resposta para '{pattern.pattern}' em {wait.timeout}s", name="network_response")
+        return [self.get_response_body(response) for response in responses]
+
+    def capture_response(self, url_pattern:Union[str, Pattern], resource_types:List[str]=None, long_wait=False, short_wait=False) -> NetworkResponse:
+        """
+            Retorna a primeira resposta cuja URL case com `url_pattern` (ver capture_responses).
+        """
+        return self.capture_responses(url_pattern, 1, resource_types, long_wait, short_wait)[0]
+
     def get_action(self):
         """
             Retorna o action do navegador.
@@ -126,8 +226,14 @@ class Selenium():
             ### params
             * url: URL que se deseja acessar.
         """
+        self._remember_origin(url)
         self.get_driver().get(url)
 
+    def _remember_origin(self, url:str):
+        parsed = urlparse(url)
+        if parsed.scheme in ("http", "https") and parsed.netloc:
+            self._visited_origins.add(f"{parsed.scheme}://{parsed.netloc}")
+
     def refresh(self):
         """
             Atualiza navegador
@@ -175,6 +281,12 @@ class Selenium():
             Move a tela para a posição inicial.
         """
         self._driver.execute_script(f"window.scrollTo(0, 0);")
+
+    def scroll_bottom(self):
+        """
+            Move a tela para o fim da página (carrega mais itens em listagens com rolagem infinita).
+        """
+        self._driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
         
     def scroll_to_element(self, selector:tuple[str, str], expected_condition:bool=True, find_if_error:bool=False):
         """
@@ -183,24 +295,18 @@ class Selenium():
             ### params
             * selector : seletor de elemento, uma tupla que especifique o tipo e a referência
             * expected_condition: utiliza o recurso EC para o elemento inserido.
-            * find_if_err: em caso de erro, faz um scroll para baixo em 250 como padrão.
+            * find_if_err: em caso de erro, rola a página até o elemento (scrollIntoView) e tenta novamente.
         """
-        if expected_condition:
-            element = self.located(selector)
-        else:
-            element = self._driver.find_element(*selector)
-            
-        if find_if_error:
-            scroll = 0
-            for _ in range(30):
-                try:
-                    self._action.move_to_element(element).perform()
-                    break
-                except:
-                    scroll += 250
-                    self._driver.execute_script(f"window.scrollTo(0, {scroll});")
-        else:
-            self._action.move_to_element(element).perform()
+        def find():
+            return self.located(selector) if expected_condition else self._driver.find_element(*selector)
+
+        def move():
+            element = find()
+            if find_if_error:
+                self._driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});", element)
+            ActionChains(self._driver).move_to_element(element).perform()
+
+        self._wait.retry_stale(move, name="scroll_to_element")
 
     def _wait_load_element(self, selector:tuple[str, str], long_wait=False):
         """
@@ -209,11 +315,16 @@ class Selenium():
             ### params
             * selector : seletor de elemento, uma tupla que especifique o tipo e a referência
         """
-        sleep(2)
+        # em vez de um sleep fixo, espera a página parar de mudar antes de procurar o carregamento;
+        # páginas que nunca param de mudar (spinners, relógios) seguem após o limite, como o antigo sleep(2)
+        try:
+            self._short_wait.dom_quiet(timeout=2)
+        except TimeoutException:
+            pass
 
         if long_wait:           
-            return self._long_wait.until(EC.invisibility_of_element(selector))
-        self._wait.until(EC.invisibility_of_element(selector))
+            return self._long_wait.invisible(selector)
+        self._wait.invisible(selector)
     
     def _wait_url_to_be(self, url, long_wait=False, short_wait=False):
         """
@@ -244,7 +355,6 @@ class Selenium():
         """
         return self._driver.find_element(*selector).get_attribute("value")
     
-    @retry(StaleElementReferenceException, tries=5, delay=1, backoff=2)
     def clickable(self, selector:tuple[str, str], long_wait=False, short_wait=False):
         """
             Retorna o elemento indicado pelo seletor caso ele seja clicável, o tempo de espera é indicado no constructor da classe.
@@ -257,9 +367,8 @@ class Selenium():
         """
         wait = self._long_wait if long_wait else self._short_wait if short_wait else self._wait
      
-        return wait.until(EC.element_to_be_clickable(selector))
+        return wait.clickable(selector)
    
-    @retry(StaleElementReferenceException, tries=5, delay=1, backoff=2)
     def located(self, selector:tuple[str, str], long_wait=False, short_wait=False):
         """
             Retorna o elemento indicado pelo seletor caso ele seja localizado, o tempo de espera é indicado no constructor da classe.
@@ -273,7 +382,7 @@ class Selenium():
 
         wait = self._long_wait if long_wait else self._short_wait if short_wait else self._wait
 
-        return wait.until(EC.presence_of_element_located(selector))
+        return wait.located(selector)
     
     def invisibity_located(self, selector:tuple[str, str]):
         """
@@ -282,7 +391,7 @@ class Selenium():
             ### params
             * selector : seletor de elemento, uma tupla que especifique o tipo e a referência
         """
-        self._wait.until(EC.invisibility_of_element_located(selector))
+        self._wait.invisible(selector)
     
     def visibility_located(self, selector:tuple[str, str], long_wait=False, short_wait=False):
         """
@@ -296,7 +405,7 @@ class Selenium():
         """
         wait = self._long_wait if long_wait else self._short_wait if short_wait else self._wait
         
-        return self.wait.until(EC.visibility_of_element_located(selector))
+        return wait.visible(selector)
     
     def select_clickable(self, selector, value):
         """
@@ -308,7 +417,7 @@ class Selenium():
             ### return
             * elemento indicado
         """
-        return Select(self._wait.until(EC.element_to_be_clickable(selector))).select_by_value(value)
+        return self._wait.retry_stale(lambda: Select(self._wait.clickable(selector)).select_by_value(value), name="select_clickable")
         
     def is_visible_element(self, selector:tuple[str, str]):
         """
@@ -339,7 +448,84 @@ class Selenium():
         """
 
         return self.located(selector).text
-        
+
+    def extract_table(self, selector:tuple[str, str], offset:int=0):
+        """
+            Extrai cabeçalhos e células de uma tabela em uma única chamada ao navegador,
+            evitando um round-trip do WebDriver por linha e por célula.
+
+            ### params
+            * selector : seletor da tabela, uma tupla que especifique o tipo e a referência
+            * offset : quantidade de linhas de dados iniciais ignoradas (ex.: já extraídas antes de rolar a página)
+
+            ### return
+            * tupla (colunas, linhas), pronta para pd.DataFrame(linhas, columns=colunas)
+        """
+        return self._wait.retry_stale(lambda: self._extract_table(self.located(selector), offset), name="extract_table")
+
+    def _extract_table(self, table, offset:int=0):
+        columns, rows = self._driver.execute_script(
+            """
+            const [table, offset] = [arguments[0], arguments[1]];
+            const text = (cell) => (cell.innerText || cell.textContent || "").replace(/\\s+/g, " ").trim();
+            const columns = [];
+            const rows = [];
+            let skipped = 0;
+            for (const tr of table.rows) {
+                const headers = tr.querySelectorAll(":scope > th");
+                const cells = tr.querySelectorAll(":scope > td");
+                headers.forEach((th) => columns.push(text(th)));
+                if (cells.length && skipped++ >= offset) {
+                    rows.push(Array.from(cells, text));
+                }
+            }
+            return [columns, rows];
+            """,
+            table,
+            offset,
+        )
+        return columns, rows
+
+    def reset_session(self):
+        """
+            Limpa o estado da sessão para reuso: fecha abas extras, apaga cookies, cache e storage
+            de todas as origens visitadas (não só a da página atual) e volta para uma página em branco.
+        """
+        handles = self._driver.window_handles
+        for handle in handles[1:]:
+            self._driver.switch_to.window(handle)
+            self._remember_origin(self._driver.current_url)
+            self._driver.close()
+        self._driver.switch_to.window(handles[0])
+        self._driver.switch_to.default_content()
+        self._remember_origin(self._driver.current_url)
+
+        # cookies e cache do navegador inteiro, e storage (localStorage, IndexedDB, service workers...) por origem
+        self._driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        self._driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        for origin in sorted(self._visited_origins):
+            self._driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        self._visited_origins.clear()
+
+        self._driver.delete_all_cookies()
+        try:
+            self._driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            # páginas sem storage acessível (ex.: about:blank, data:)
+            pass
+        self._driver.get("about:blank")
+        if self.performance_log:
+            self.clear_network_log()
+
+    def quit(self):
+        """
+            Encerra o navegador.
+        """
+        try:
+            self._driver.quit()
+        except:
+            pass
+
         
     def __enter__(self):
         self.start()
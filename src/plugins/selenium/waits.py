@@ -0,0 +1,182 @@
+import threading
+
+from time import monotonic, sleep
+from typing import Callable
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+
+# Resolve com true quando o DOM fica `quiet_ms` sem mutações (MutationObserver), ou com false
+# ao atingir `deadline_ms`, sempre desconectando o observer (nada fica preso à página)
+DOM_QUIET_SCRIPT = """
+const [quietMs, deadlineMs, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+let timer = setTimeout(() => finish(true), quietMs);
+const deadline = setTimeout(() => finish(false), deadlineMs);
+const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(() => finish(true), quietMs); });
+function finish(ok) { observer.disconnect(); clearTimeout(timer); clearTimeout(deadline); done(ok); }
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+"""
+
+# Resolve com true quando o documento terminou de carregar e nenhum recurso novo (fetch, XHR, imagens...)
+# foi registrado no Resource Timing por `idle_ms`, ou com false ao atingir `deadline_ms`
+NETWORK_IDLE_SCRIPT = """
+const [idleMs, deadlineMs, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+let timer = null;
+const arm = () => { clearTimeout(timer); timer = setTimeout(() => finish(true), idleMs); };
+const observer = new PerformanceObserver(arm);
+const deadline = setTimeout(() => finish(false), deadlineMs);
+function finish(ok) { observer.disconnect(); clearTimeout(timer); clearTimeout(deadline); window.removeEventListener("load", arm); done(ok); }
+observer.observe({type: "resource", buffered: false});
+if (document.readyState === "complete") { arm(); }
+else { window.addEventListener("load", arm, {once: true}); }
+"""
+
+# folga entre o prazo interno dos scripts assíncronos e o script timeout do driver
+SCRIPT_DEADLINE_MARGIN_MS = 100
+
+class WaitStats():
+    def __init__(self):
+        """
+            # WaitStats
+            Acumula a latência de cada tipo de espera (quantidade, total, máximo e timeouts).
+        """
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name:str, elapsed:float, timed_out:bool=False):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"waits": 0, "total_s": 0.0, "max_s": 0.0, "timeouts": 0})
+            stats["waits"] += 1
+            stats["total_s"] += elapsed
+            stats["max_s"] = max(stats["max_s"], elapsed)
+            stats["timeouts"] += int(timed_out)
+
+    def summary(self, reset:bool=False) -> dict:
+        """
+            Retorna {nome: {waits, total_s, avg_s, max_s, timeouts}}.
+
+            ### params
+            * reset : zera as estatísticas após a leitura
+        """
+        with self._lock:
+            summary = {
+                name: {**stats, "avg_s": stats["total_s"] / stats["waits"]}
+                for name, stats in self._stats.items()
+            }
+            if reset:
+                self._stats = {}
+        return summary
+
+class WaitEngine():
+    def __init__(self, driver, timeout:float=30, poll_frequency:float=0.05, stats:WaitStats=None):
+        """
+            # WaitEngine
+            Esperas orientadas a eventos, sem sleeps fixos: as condições são reavaliadas a cada
+            `poll_frequency` segundos, elementos obsoletos (stale) são relocalizados na hora e
+            sinais da própria página (MutationObserver, Resource Timing) são aguardados via
+            execute_async_script. A latência de cada espera é registrada em `stats`.
+
+            Compatível com WebDriverWait.until, podendo substituí-lo.
+
+            ### Params
+            * driver : WebDriver em uso
+            * timeout : tempo máximo de espera, em segundos
+            * poll_frequency : intervalo entre avaliações da condição, em segundos
+            * stats : WaitStats compartilhado (por padrão, um novo)
+        """
+        self._driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.stats = stats or WaitStats()
+
+    def until(self, method:Callable, message:str="", timeout:float=None, name:str=None):
+        """
+            Aguarda até que `method(driver)` retorne um valor verdadeiro, e o retorna.
+
+            NoSuchElementException e StaleElementReferenceException apenas fazem a condição ser
+            reavaliada (relocalizando o elemento) na próxima verificação, sem atraso extra.
+        """
+        name = name or getattr(method, "__name__", type(method).__name__)
+        timeout = self.timeout if timeout is None else timeout
+        start = monotonic()
+        deadline = start + timeout
+        while True:
+            try:
+                value = method(self._driver)
+                if value:
+                    self.stats.record(name, monotonic() - start)
+                    return value
+            except StaleElementReferenceException:
+                # o DOM mudou entre localizar e avaliar: reavalia imediatamente
+                if monotonic() < deadline:
+                    continue
+            except NoSuchElementException:
+                pass
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                self.stats.record(name, monotonic() - start, timed_out=True)
+                raise TimeoutException(message or f"{name} não satisfeita em {timeout}s")
+            sleep(min(self.poll_frequency, remaining))
+
+    def retry_stale(self, func:Callable, attempts:int=5, name:str="retry_stale"):
+        """
+            Executa `func()` e, se algum elemento ficar obsoleto no meio, repete imediatamente
+            (func deve relocalizar os elementos que usa).
+        """
+        start = monotonic()
+        for attempt in range(attempts):
+            try:
+                result = func()
+                self.stats.record(name, monotonic() - start)
+                return result
+            except StaleElementReferenceException:
+                if attempt == attempts - 1:
+                    self.stats.record(name, monotonic() - start, timed_out=True)
+                    raise
+
+    def located(self, selector:tuple[str, str], timeout:float=None):
+        return self.until(EC.presence_of_element_located(selector), timeout=timeout, name="located")
+
+    def clickable(self, selector:tuple[str, str], timeout:float=None):
+        return self.until(EC.element_to_be_clickable(selector), timeout=timeout, name="clickable")
+
+    def visible(self, selector:tuple[str, str], timeout:float=None):
+        return self.until(EC.visibility_of_element_located(selector), timeout=timeout, name="visible")
+
+    def invisible(self, selector:tuple[str, str], timeout:float=None):
+        return self.until(EC.invisibility_of_element_located(selector), timeout=timeout, name="invisible")
+
+    def _async(self, name:str, script:str, *args, timeout:float=None):
+        """
+            Executa um script assíncrono que recebe, após `args`, um prazo em milissegundos (um pouco
+            abaixo do timeout) e resolve com false ao atingi-lo. O script timeout anterior do driver
+            é restaurado ao final.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline_ms = max(0, int(timeout * 1000) - SCRIPT_DEADLINE_MARGIN_MS)
+        start = monotonic()
+        previous = self._driver.timeouts.script
+        self._driver.set_script_timeout(timeout)
+        try:
+            result = self._driver.execute_async_script(script, *args, deadline_ms)
+            if result is False:
+                raise TimeoutException(f"{name} não satisfeita em {timeout}s")
+        except TimeoutException:
+            self.stats.record(name, monotonic() - start, timed_out=True)
+            raise
+        finally:
+            self._driver.set_script_timeout(previous)
+        self.stats.record(name, monotonic() - start)
+        return result
+
+    def dom_quiet(self, quiet_ms:int=250, timeout:float=None):
+        """
+            Aguarda o DOM ficar `quiet_ms` milissegundos sem mutações.
+        """
+        return self._async("dom_quiet", DOM_QUIET_SCRIPT, quiet_ms, timeout=timeout)
+
+    def network_idle(self, idle_ms:int=500, timeout:float=None):
+        """
+            Aguarda o carregamento do documento e `idle_ms` milissegundos sem novas requisições.
+        """
+        return self._async("network_idle", NETWORK_IDLE_SCRIPT, idle_ms, timeout=timeout)
@@ -0,0 +1,144 @@
+import atexit
+import sqlite3
+import threading
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from typing import Dict, Tuple
+
+class ConnectionFactory():
+    def __init__(self, db_location: str, journal_mode: str = "WAL", synchronous: str = "NORMAL",
+                 mmap_size: int = 256 * 1024 * 1024, cache_size: int = -64_000, busy_timeout: int = 5_000,
+                 cached_statements: int = 256) -> None:
+        """
+        Cria conexões SQLite já configuradas para leitura e escrita concorrentes no mesmo arquivo.
+
+        :param db_location: caminho do arquivo do banco
+        :param journal_mode: modo do journal (WAL permite leitores simultâneos a um escritor)
+        :param synchronous: nível de sincronização com o disco (NORMAL é seguro em WAL)
+        :param mmap_size: bytes do arquivo mapeados em memória (0 desativa)
+        :param cache_size: tamanho do cache de páginas (negativo = KiB)
+        :param busy_timeout: tempo (ms) de espera por um lock antes de falhar
+        :param cached_statements: quantidade de comandos preparados mantidos em cache por conexão
+        """
+        self.db_location = db_location
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+
+    def __call__(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_location,
+            timeout=self.busy_timeout / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        if self.journal_mode:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        if self.synchronous:
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        return conn
+
+class ConnectionPool():
+    def __init__(self, factory: ConnectionFactory, size: int = 4) -> None:
+        """
+        Pool thread-safe de conexões SQLite. Cada conexão é usada por uma thread de cada vez.
+
+        :param factory: ConnectionFactory que cria as conexões
+        :param size: quantidade máxima de conexões abertas
+        """
+        self.factory = factory
+        self.size = size
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._all = []
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = None) -> sqlite3.Connection:
+        """
+        Retorna uma conexão livre, criando uma nova se o pool ainda não estiver cheio
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"Nenhuma conexão livre para {self.factory.db_location}.")
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        try:
+            conn = self.factory()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """
+        Devolve a conexão ao pool, descartando transações não concluídas
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+        except sqlite3.ProgrammingError:
+            # conexão fechada por quem a usava
+            with self._lock:
+                if conn in self._all:
+                    self._all.remove(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        conn = self.acquire(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """
+        Fecha todas as conexões do pool
+        """
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._idle = LifoQueue()
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_location: str, size: int = 4, **settings) -> ConnectionPool:
+    """
+    Retorna o pool compartilhado do arquivo de banco, criando-o no primeiro uso.
+    Tabelas que usam o mesmo arquivo e as mesmas configurações compartilham conexões.
+
+    :param db_location: caminho do arquivo do banco
+    :param size: quantidade máxima de conexões abertas
+    :param settings: parâmetros do ConnectionFactory
+    """
+    key = (db_location, size, tuple(sorted(settings.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(ConnectionFactory(db_location, **settings), size=size)
+        return _pools[key]
+
+@atexit.register
+def close_pools():
+    """
+    Fecha as conexões de todos os pools compartilhados
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -1,25 +1,118 @@
 import sqlite3
 import pandas as pd
-from typing import List, Tuple
+from .connection import ConnectionPool, get_pool
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+class ChunkedQuery():
+    def __init__(self, conn: sqlite3.Connection, query: str, params: tuple = None, chunksize: int = 10_000, **pd_kwargs) -> None:
+        """
+        Consulta lida em blocos. Cada iteração executa a consulta novamente e produz DataFrames
+        de até `chunksize` linhas, de modo que o uso de memória não depende do tamanho da tabela.
+
+        :param conn: conexão SQLite
+        :param query: comando SQL, normalmente do tipo SELECT
+        :param params: parâmetros da query (opcional)
+        :param chunksize: quantidade máxima de linhas por bloco
+        """
+        self._conn = conn
+        self.query = query
+        self.params = params
+        self.chunksize = chunksize
+        self.pd_kwargs = pd_kwargs
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        return pd.read_sql(self.query, self._conn, params=self.params, chunksize=self.chunksize, **self.pd_kwargs)
 
 class SQLiteTable():
+    # Lista de migrações da tabela, em ordem. Cada migração é uma lista de comandos SQL,
+    # onde {table_name} é substituído pelo nome da tabela.
+    migrations: List[List[str]] = []
+
+    # Migração que mantém um contador de alterações da tabela em table_versions, via triggers.
+    # Tabelas que a incluem em `migrations` passam a ter fingerprint().
+    CHANGE_TRACKING_MIGRATION: List[str] = [
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            uid TEXT NOT NULL,
+            version INTEGER NOT NULL
+        );
+        """,
+        "INSERT OR IGNORE INTO table_versions (table_name, uid, version) VALUES ('{table_name}', lower(hex(randomblob(8))), 0);",
+        *(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{{table_name}}_version_{event.lower()}
+            AFTER {event} ON {{table_name}}
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE table_name = '{{table_name}}';
+            END;
+            """
+            for event in ("INSERT", "UPDATE", "DELETE")
+        ),
+    ]
     
-    def __init__(self, db_location) -> None:
-        self._conn = sqlite3.connect(db_location)
+    def __init__(self, db_location, pool: ConnectionPool = None, **connection_settings) -> None:
+        """
+        :param db_location: caminho do arquivo do banco
+        :param pool: pool de conexões (por padrão, o pool compartilhado do arquivo, ver get_pool)
+        :param connection_settings: parâmetros do get_pool/ConnectionFactory (journal_mode, synchronous, mmap_size, ...)
+        """
+        self._pool = pool or get_pool(db_location, **connection_settings)
+        self._conn = self._pool.acquire()
         
-    def executemany(self, query:str, values: List[Tuple]):
+    def executemany(self, query:str, values: Iterable[Tuple], batch_size: int = None):
         """
         Executa query SQL em massa
 
         :param query: comando SQL, normalmente do tipo INSERT
         :param values: tupla de valores que serão iseridos na tabela
+        :param batch_size: quantidade de linhas por transação (por padrão, todas em uma única transação)
         """
+        values = iter(values)
         try:
-            self._conn.executemany(query, values)
-            self.commit()
+            while True:
+                batch = list(islice(values, batch_size)) if batch_size else list(values)
+                if not batch:
+                    break
+                self._conn.executemany(query, batch)
+                self.commit()
+                if not batch_size:
+                    break
         except Exception as e:
             self._conn.rollback()
             raise e
+
+    def migrate(self):
+        """
+        Aplica as migrações pendentes da tabela, registrando a versão atual em schema_migrations.
+        Cada migração roda em uma transação própria.
+        """
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+        """)
+        row = self._conn.execute(
+            "SELECT version FROM schema_migrations WHERE table_name = ?", (self.table_name,)
+        ).fetchone()
+        current = row[0] if row else 0
+
+        for version, statements in enumerate(self.migrations[current:], start=current + 1):
+            try:
+                self._conn.execute("BEGIN")
+                for statement in statements:
+                    self._conn.execute(statement.format(table_name=self.table_name))
+                self._conn.execute(
+                    "INSERT INTO schema_migrations (table_name, version) VALUES (?, ?) "
+                    "ON CONFLICT(table_name) DO UPDATE SET version = excluded.version",
+                    (self.table_name, version),
+                )
+                self.commit()
+            except Exception as e:
+                self._conn.rollback()
+                raise e
             
     def execute(self, query:str, params: tuple = None):
         """
@@ -31,7 +124,8 @@ class SQLiteTable():
         """
         try:
             cursor = self._conn.execute(query, params or ())
-            self._conn.commit()
+            if self._conn.in_transaction:
+                self._conn.commit()
             return cursor
         except Exception as e:
             self._conn.rollback()
@@ -45,6 +139,37 @@ class SQLiteTable():
         :returns: Pandas DataFrame com o resultado da consulta
         """
         return pd.read_sql(query, self._conn, **pd_kwargs)
+
+    def fingerprint(self) -> str:
+        """
+        Identificador do conteúdo atual da tabela, que muda a cada INSERT, UPDATE ou DELETE.
+        Requer CHANGE_TRACKING_MIGRATION entre as migrações da tabela.
+
+        :returns: texto "<tabela>:<uid>:<versão>", ou None se a tabela não tiver controle de alterações
+        """
+        try:
+            row = self._conn.execute(
+                "SELECT uid, version FROM table_versions WHERE table_name = ?", (self.table_name,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return None if row is None else f"{self.table_name}:{row[0]}:{row[1]}"
+
+    def read_chunks(self, columns: List[str] = None, where: str = None, params: tuple = None, chunksize: int = 10_000, **pd_kwargs) -> ChunkedQuery:
+        """
+        Lê a tabela em blocos, com projeção de colunas e filtro aplicados no próprio SQLite
+
+        :param columns: colunas a serem lidas (por padrão, todas)
+        :param where: condição SQL, sem a palavra WHERE (ex.: "regiao = ?")
+        :param params: parâmetros da condição
+        :param chunksize: quantidade máxima de linhas por bloco
+        :returns: ChunkedQuery, iterável (mais de uma vez) de DataFrames
+        """
+        projection = ", ".join('"' + column.replace('"', '""') + '"' for column in columns) if columns else "*"
+        query = f"SELECT {projection} FROM {self.table_name}"
+        if where:
+            query += f" WHERE {where}"
+        return ChunkedQuery(self._conn, query, params=params, chunksize=chunksize, **pd_kwargs)
     
     def commit(self):
         """
@@ -60,10 +185,19 @@ class SQLiteTable():
          
     def __enter__(self):
         self.create_table()
+        self.migrate()
         return self
     
+    def close(self):
+        """
+        Devolve a conexão ao pool
+        """
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+    
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._conn.close()
+        self.close()
         if exc_type is not None:
             print(f'exc_type : {exc_type}')
         if exc_tb is not None:
@@ -0,0 +1,6 @@
+import os, sys
+
+# the code runs from src/, as main.py does (relative paths, ./app_config.yml loaded on `import app`)
+SRC = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, SRC)
+os.chdir(SRC)
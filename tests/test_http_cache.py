@@ -0,0 +1,127 @@
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from plugins.http import HttpCache, HttpSession
+
+class StubServer:
+    """ Local HTTP server with ETag/Last-Modified validators that counts requests and 304s per path """
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = Counter()
+        self.not_modified = Counter()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests[self.path] += 1
+                body, etag = stub.pages[self.path]
+                if self.headers.get("If-None-Match") == etag:
+                    stub.not_modified[self.path] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def publish(self, path: str, body: str):
+        self.pages[path] = (body, f'"{hash(body) & 0xffffffff:x}"')
+
+@pytest.fixture
+def server():
+    stub = StubServer()
+    stub.thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+@pytest.fixture
+def session():
+    with HttpSession(retries=0) as session:
+        yield session
+
+def test_revalidation_reuses_snapshot(server, session, tmp_path):
+    server.publish("/estados", "<table><tr><th>Estado</th></tr><tr><td>Sergipe</td></tr></table>")
+    cache = HttpCache(directory=str(tmp_path), ttl=0)
+    url = server.url("/estados")
+
+    page = cache.fetch(session, url)
+    assert (page.status, page.changed) == ("modified", True)
+    df = pd.DataFrame({"estado": ["Sergipe"]})
+    cache.save_snapshot(url, df, "v1")
+
+    page = cache.fetch(session, url)
+    assert (page.status, page.changed) == ("revalidated", False)
+    assert server.not_modified["/estados"] == 1
+    assert page.text.startswith("<table>")
+    pd.testing.assert_frame_equal(cache.load_snapshot(url, "v1"), df)
+
+    # a changed page drops the snapshots derived from the old version
+    server.publish("/estados", "<table><tr><th>Estado</th></tr><tr><td>Tocantins</td></tr></table>")
+    page = cache.fetch(session, url)
+    assert (page.status, page.changed) == ("modified", True)
+    assert cache.load_snapshot(url, "v1") is None
+    assert server.requests["/estados"] == 3
+
+def test_ttl_serves_from_disk_without_requests(server, session, tmp_path):
+    server.publish("/estados", "<p>estados</p>")
+    cache = HttpCache(directory=str(tmp_path), ttl=3600)
+    url = server.url("/estados")
+
+    assert cache.fetch(session, url).status == "modified"
+    page = cache.fetch(session, url)
+    assert (page.status, page.text) == ("fresh", "<p>estados</p>")
+    assert server.requests["/estados"] == 1
+
+    # the index is persisted: a new instance over the same directory is still fresh
+    assert HttpCache(directory=str(tmp_path), ttl=3600).fetch(session, url).status == "fresh"
+    assert server.requests["/estados"] == 1
+
+def test_lru_eviction_by_max_bytes(server, session, tmp_path):
+    for path in ("/a", "/b", "/c"):
+        server.publish(path, path[1] * 1000)
+    cache = HttpCache(directory=str(tmp_path), ttl=3600, max_bytes=2500)
+
+    cache.fetch(session, server.url("/a"))
+    cache.fetch(session, server.url("/b"))
+    # touching /a makes /b the least recently used entry
+    assert cache.fetch(session, server.url("/a")).status == "fresh"
+    cache.fetch(session, server.url("/c"))
+
+    assert cache.fetch(session, server.url("/a")).status == "fresh"
+    assert cache.fetch(session, server.url("/c")).status == "fresh"
+    assert cache.fetch(session, server.url("/b")).status == "modified"
+    assert server.requests == Counter({"/a": 1, "/b": 2, "/c": 1})
+
+def test_corrupt_snapshot_is_dropped_from_the_saved_index(server, session, tmp_path):
+    server.publish("/estados", "<p>estados</p>")
+    cache = HttpCache(directory=str(tmp_path), ttl=3600)
+    url = server.url("/estados")
+    cache.fetch(session, url)
+    cache.save_snapshot(url, pd.DataFrame({"estado": ["Sergipe"]}), "v1")
+    with open(cache._path(cache._key(url), ".v1.pkl"), "wb") as f:
+        f.write(b"corrupt")
+
+    assert cache.load_snapshot(url, "v1") is None
+    reloaded = HttpCache(directory=str(tmp_path), ttl=3600)
+    assert reloaded._index[reloaded._key(url)]["snapshots"] == []
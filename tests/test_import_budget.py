@@ -0,0 +1,24 @@
+"""
+Import-time budget of the entry point (see benchmarks/bench_import.py).
+
+Set IMPORT_BUDGET_SCALE to relax the time budgets on slow machines.
+"""
+import os, importlib.util
+import pytest
+
+BENCH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "bench_import.py")
+spec = importlib.util.spec_from_file_location("bench_import", BENCH_PATH)
+bench_import = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_import)
+
+SCALE = float(os.environ.get("IMPORT_BUDGET_SCALE", "1"))
+
+def test_report_only_path_skips_extraction_dependencies():
+    _, loaded = bench_import.measure(bench_import.SCENARIOS["read_and_process"]["code"])
+    assert not {"selenium", "requests", "openpyxl"} & loaded
+
+@pytest.mark.parametrize("name", list(bench_import.SCENARIOS))
+def test_scenario_within_budget(name):
+    result = bench_import.check(name, repeat=3, scale=SCALE)
+    assert not result["forbidden_loaded"], result
+    assert result["ok"], result
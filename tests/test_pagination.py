@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+
+from dotmap import DotMap
+from selenium.common.exceptions import TimeoutException
+
+from functions import extraction
+
+COLUMNS = ["Estado", "Capital"]
+ROWS = [[f"Estado {i}", f"Capital {i}"] for i in range(6)]
+
+class ScrollingDriver:
+    """ Infinite-scroll table: 2 rows at first, 2 more per scroll; the page never goes idle after the second scroll """
+
+    def __init__(self):
+        self.loaded = 2
+        self.scrolls = 0
+        self.wait_stats = DotMap(summary=lambda reset=False: {})
+
+    def go_to_url(self, url):
+        pass
+
+    def extract_table(self, selector, offset=0):
+        return COLUMNS, ROWS[offset:self.loaded]
+
+    def scroll_bottom(self):
+        self.scrolls += 1
+        self.loaded = min(len(ROWS), self.loaded + 2)
+
+    def wait_page_ready(self, idle_ms):
+        if self.scrolls >= 2:
+            raise TimeoutException("network never idle")
+
+class FakePool:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @contextmanager
+    def session(self):
+        yield self.driver
+
+def test_scroll_keeps_rows_loaded_before_idle_timeout(monkeypatch):
+    driver = ScrollingDriver()
+    monkeypatch.setattr(extraction, "get_selenium_pool", lambda: FakePool(driver))
+    source = DotMap(name="scroll", url="https://example.com", table_attrs={}, table_index=0)
+
+    collector = extraction._scroll_pages(source, max_pages=10, idle_ms=100)
+
+    assert collector.columns == COLUMNS
+    assert collector.rows == ROWS
+    assert driver.scrolls == 2
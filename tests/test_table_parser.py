@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+
+import pytest
+from dotmap import DotMap
+
+from functions import extraction
+from plugins.http import HttpSession, parse_table
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "tabelas.html")
+
+@pytest.fixture(scope="module")
+def html():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+def test_source_table(html):
+    columns, rows = parse_table(html, attrs={"bgcolor": "#ffffff"})
+    assert columns == ["Estado", "Sigla", "Capital", "Região"]
+    assert rows == [["Sergipe", "SE", "Aracaju", "Nordeste"], ["Tocantins", "TO", "Palmas", "Norte"]]
+
+def test_omitted_end_tags(html):
+    assert parse_table(html, attrs={"id": "sem-fechamento"}) == (
+        ["Estado", "Capital"],
+        [["Sergipe", "Aracaju"], ["Tocantins", "Palmas"]],
+    )
+
+def test_td_header_row(html):
+    assert parse_table(html, attrs={"id": "cabecalho-td"}) == (["Estado", "Capital"], [["Sergipe", "Aracaju"]])
+
+def test_nested_table_text_stays_out_of_the_cell(html):
+    assert parse_table(html, attrs={"id": "aninhada"}) == (["Estado", "Capital"], [["Sergipe", "Aracaju"]])
+
+def test_th_row_header_is_data(html):
+    assert parse_table(html, attrs={"id": "th-linha"}) == (
+        ["Estado", "Capital"],
+        [["Sergipe", "Aracaju"], ["Tocantins", "Palmas"]],
+    )
+
+@pytest.mark.parametrize("attrs", [{"id": "inexistente"}, {"id": "vazia"}])
+def test_missing_or_empty_table_raises_lookup_error(html, attrs):
+    with pytest.raises(LookupError):
+        parse_table(html, attrs=attrs)
+
+def test_missing_table_falls_back_to_selenium(monkeypatch):
+    monkeypatch.setattr(extraction, "get_http_cache", lambda: None)
+    calls = []
+
+    def fetch_table_selenium(source, session=None):
+        calls.append(source.name)
+        return ["Estado", "Capital", "Região"], [["Sergipe", "Aracaju", "Nordeste"]]
+
+    monkeypatch.setattr(extraction, "_fetch_table_selenium", fetch_table_selenium)
+    source = DotMap(
+        name="fixture", url=Path(FIXTURE).as_uri(), engine="http", table_attrs={"id": "inexistente"},
+        table_index=0, columns={"Estado": "estado", "Capital": "capital", "Região": "regiao"},
+        timeout=5, pagination=None, _dynamic=False,
+    )
+    with HttpSession() as session:
+        df = extraction.fetch_source(source, session)
+
+    assert calls == ["fixture"]
+    assert df.to_dict("records") == [{"estado": "Sergipe", "capital": "Aracaju", "regiao": "Nordeste"}]